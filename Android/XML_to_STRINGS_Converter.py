@@ -1,36 +1,69 @@
+from __future__ import annotations
+
 import re
 import os
+import copy
 import sys
 import time
 import json
+import array
+import struct
+import fnmatch
+import hashlib
+import marshal
 import logging
-import platform
-import subprocess
+import threading
+import collections.abc
+import datetime
+import heapq
+import bisect
+import operator
+import itertools
+import contextlib
+import tracemalloc
 from pathlib import Path
 
-try:
-    from lxml import etree as ET # type: ignore
-except ImportError:
-    import subprocess
-    import sys
-    print("Module 'lxml' not found. Installing...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "lxml"])
-    from lxml import etree as ET # type: ignore
-
-try:
-    import readchar # type: ignore
-except ImportError:
-    print("Module 'readchar' not found. Installing...")
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "readchar"])
-    import readchar # type: ignore
+import escape_codec
+import strings_api
+from strings_api import APP_NAME, STRINGS_HEADER, EXPORT_BATCH_SIZE
+
+# readchar, multiprocessing and argparse are imported where they are first needed (and the XML
+# library by strings_api), so a single conversion does not pay for what it never uses
+
+def load_readchar():
+    """Return the readchar module, or None when it is not installed (input then works line by line)."""
+    try:
+        import readchar # type: ignore
+    except ImportError:
+        return None
+    return readchar
+
+def split_archive_path(file_path: str):
+    """Split "app.apk!/values-de/strings.xml" into ("app.apk", "values-de/strings.xml"); (None, file_path) for plain paths."""
+    archive, separator, member = file_path.partition(ARCHIVE_SEPARATOR)
+    if not separator:
+        return None, file_path
+    return archive, member.replace("\\", "/")
 
 class InvalidFileExtension(BaseException): ...
 class UserCancelled(BaseException): ...
 
-APP_NAME = "Android XML to iOS STRINGS Converter"
+# Rough bytes of Python object overhead per buffered (name, line) pair on top of the text itself
+STREAM_ENTRY_OVERHEAD = 160
+SPILL_CHUNK_SIZE = 1000
+# Texts up to this length are shared between the StringTables of a StringPool
+SHARED_TEXT_LENGTH = 40
+# Entries of zip-based archives (APK, AAR, zipped res/ folders) are addressed as <archive>!/<entry>
+ARCHIVE_SEPARATOR = "!/"
+# Compiled resource tables (resources.arsc): chunk header (type, header size, chunk size) and chunk types
+ARSC_CHUNK = struct.Struct("<HHI")
+ARSC_STRING_POOL = 0x0001
+ARSC_TABLE = 0x0002
+ARSC_PACKAGE = 0x0200
+ARSC_TYPE = 0x0201
 
 class XMLtoSTRINGS:
-    def __init__(self):
+    def __init__(self, interactive: bool = True, log_queue=None):
         self.ts = {
             "app_title": f"{APP_NAME} by veydzh3r",
             "menu_option_1": "Export strings from .xml",
@@ -43,13 +76,22 @@ class XMLtoSTRINGS:
             "file_input_existing": "Enter the path to a {} file: ",
             "file_input_existing_not_found": "Specified {} file not found! Try again.",
             "file_input_existing_invalid": "Invalid file format! Should be {}!",
+            "file_input_existing_archive": "Archive entries can only be exported! Enter a {} file on disk.",
             "menu_option_1_result": "No strings found in .xml file!",
             "menu_option_2_result": "No strings found in .strings file!",
             "menu_option_4_result": "Exiting the program...",
             "settings_title": "Settings",
-            "settings_option_1": "Toggle detailed export output: {}",
-            "settings_option_2": "Toggle detailed import output: {}",
-            "settings_option_3": "Back",
+            "settings_detailed_export": "Toggle detailed export output: {}",
+            "settings_detailed_import": "Toggle detailed import output: {}",
+            "settings_streaming_xml_parse": "Toggle streaming XML parsing: {}",
+            "settings_patch_import": "Toggle in-place XML patching on import: {}",
+            "settings_convert_format_specifiers": "Toggle %s <-> %@ format specifier conversion: {}",
+            "settings_validate_placeholders": "Toggle placeholder validation on import: {}",
+            "settings_binary_strings": "Toggle binary property list .strings output: {}",
+            "settings_overwrite_if_changed": "Toggle overwriting existing outputs only when their content changed: {}",
+            "settings_profiling": "Toggle per-phase profiling: {}",
+            "settings_clear_cache": "Clear parse cache",
+            "settings_back": "Back",
             "export_error": "Export error: {}",
             "total_strings": "Total strings: {}",
             "exported_strings": "Exported strings: {}",
@@ -58,30 +100,73 @@ class XMLtoSTRINGS:
             "strings_saved": "Strings have been saved to {}!",
             "strings_reading_error": "Error reading file {}: {}",
             "imported_strings": "Imported strings: {}",
+            "placeholder_mismatches": "Placeholder mismatches (not imported): {}",
             "no_strings_to_update": "Found no strings to update!",
             "import_error": "Import error: {}",
             "press_any_key_to_exit": "Press any key to exit...",
             "program_interrupted": "Program interrupted by user.",
-            "unexpected_error": "Unexpected error: {}\nReport the error to veydzh3r."
+            "unexpected_error": "Unexpected error: {}\nReport the error to veydzh3r.",
+            "batch_no_locales": "No values*/strings.xml files found in {}!",
+            "batch_no_tables": "No *.lproj/{} files found in {}!",
+            "batch_archive_import": "Cannot import into {}: archive entries can only be exported!",
+            "batch_export_entry": "{} -> {}: {}/{} strings",
+            "batch_import_entry": "{} -> {}: {} strings updated",
+            "batch_missing_entry": "{}: no matching {} found, skipped",
+            "batch_failed_entry": "{}: FAILED ({})",
+            "batch_summary": "Converted {} of {} files in {:.2f}s",
+            "delta_entry": "{} -> {}: {} added, {} changed, {} removed strings",
+            "watch_started": "Watching {} file(s) for changes. Press Ctrl+C to stop.",
+            "watch_entry": "{} -> {}: {} added, {} changed, {} removed in {:.1f} ms",
+            "watch_failed_entry": "{}: not updated ({})",
+            "server_started": "Serving conversions on {} with {} worker(s). Press Ctrl+C to stop.",
+            "cache_cleared": "Removed {} cached parse result(s).",
+            "profile_operation": "{}: {} strings in {:.3f}s ({:,.0f} strings/s)",
+            "profile_phase": "  {:<9} {:>8.3f}s  {:>12,.0f} strings/s  peak {:>8.1f} MB",
+            "profile_saved": "Metrics appended to {}"
         }
+        self.interactive = interactive
         self.config = Config()
-        self.setup_logging()
+        self.setup_logging(log_queue)
         self.logger = logging.getLogger(__name__)
+        self.cache = ParseCache(self.config)
+        self.archives = {}
+        metrics_file = self.config.get("profile_metrics_file") or self.config.get_config_path("profile_metrics.jsonl", f"veydzh3r\\{APP_NAME}")
+        self.profiler = PhaseProfiler(self.config.get("profiling", False), str(metrics_file))
         self.logger.info(f"Application started: {APP_NAME}")
-        self.main()
+        if interactive:
+            self.main()
+    
+    def debug_sample(self):
+        """Log every how many-th key of a file at DEBUG level: 0 (no per-key lines at all) unless DEBUG is on."""
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return 0
+        return max(1, int(self.config.get("debug_sample_every", 1)))
     
-    def setup_logging(self):
+    def setup_logging(self, log_queue=None):
+        log_level = getattr(logging, self.config.get("log_level", "INFO").upper()) # type: ignore
+        
+        if log_queue is not None:
+            # Batch workers hand their records to the parent process, which owns the log file
+            from logging.handlers import QueueHandler
+            queue_handler = QueueHandler(log_queue)
+            queue_handler.setFormatter(logging.Formatter("%(message)s"))
+            logging.basicConfig(level=log_level, handlers=[queue_handler], force=True)
+            return
+        
+        if logging.getLogger().handlers:
+            return  # Already set up by an earlier instance in this process
+        
         log_file = "xml_to_strings.log"
         log_dir = Path(self.config.get_config_path(log_file, f"veydzh3r\\{APP_NAME}"))
         
-        log_level = getattr(logging, self.config.get("log_level", "INFO").upper()) # type: ignore
-        
         formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
             datefmt='%Y-%m-%d %H:%M:%S'
         )
         
-        from logging.handlers import RotatingFileHandler
+        import queue
+        import atexit
+        from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
         file_handler = RotatingFileHandler(
             log_dir,
             maxBytes=5*1024*1024,  # 5MB
@@ -90,13 +175,22 @@ class XMLtoSTRINGS:
         file_handler.setLevel(log_level)
         file_handler.setFormatter(formatter)
         
+        # The log file is written by a background thread, so callers only pay for queueing a record
+        log_queue = queue.SimpleQueue()
+        listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        atexit.register(listener.stop)
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.setLevel(log_level)
+        queue_handler.setFormatter(logging.Formatter("%(message)s"))
+        
         console_handler = logging.StreamHandler()
         console_handler.setLevel(logging.ERROR)
         console_handler.setFormatter(formatter)
         
         logging.basicConfig(
             level=log_level,
-            handlers=[file_handler, console_handler]
+            handlers=[queue_handler, console_handler]
         )
         
     def main(self):
@@ -127,7 +221,7 @@ class XMLtoSTRINGS:
                 
                 elif choice == 2:
                     self.logger.info("Starting STRINGS to XML import process")
-                    xml_file_path = self.file_input("existing", "xml")
+                    xml_file_path = self.file_input("existing", "xml", archive_entries=False)
                     
                     if xml_file_path:
                         self.logger.info(f"Source XML file selected: {xml_file_path}")
@@ -161,7 +255,7 @@ class XMLtoSTRINGS:
                     self.logger.warning(f"Invalid menu choice: {choice}")
                     continue
                 
-                print(f"\n{self.ts['press_any_key_to_exit']}"); readchar.readkey(); self.main()
+                print(f"\n{self.ts['press_any_key_to_exit']}"); self.wait_key(); self.main()
             
             except FileNotFoundError as e:
                 self.logger.error(f"File not found: {str(e)}")
@@ -178,86 +272,197 @@ class XMLtoSTRINGS:
             except Exception as e:
                 self.logger.exception(f"Unexpected error in main loop: {str(e)}")
                 print(f"{self.ts['unexpected_error'].format(str(e))}\n{self.ts['press_any_key_to_exit']}")
-                readchar.readkey()
+                self.wait_key()
                 break
             
     def open_settings(self):
-        detailed_export = self.config.get("detailed_export")
-        detailed_import = self.config.get("detailed_import")
+        toggles = ["detailed_export", "detailed_import", "streaming_xml_parse", "patch_import", "convert_format_specifiers", "validate_placeholders", "binary_strings", "overwrite_if_changed", "profiling"]
+        defaults = self.config.get_defaults()
+        values = {key: self.config.get(key, defaults[key]) for key in toggles}
+        
+        options = {num: self.ts[f"settings_{key}"].format(values[key]) for num, key in enumerate(toggles, 1)}
+        clear_cache_choice = len(options) + 1
+        back_choice = len(options) + 2
+        options[clear_cache_choice] = self.ts["settings_clear_cache"]
+        options[back_choice] = self.ts["settings_back"]
         
         self.clear()
         self.print_box([APP_NAME, self.ts["settings_title"]], alignment="center")
-        choice = self.choice_input("", {1: self.ts["settings_option_1"].format(detailed_export), 2: self.ts["settings_option_2"].format(detailed_import), 3: self.ts["settings_option_3"]})
-
-        if choice == 1:
-            new_value = not detailed_export
-            self.config.set("detailed_export", new_value)
-            self.logger.info(f"Changed detailed_export setting to: {new_value}")
-        elif choice == 2:
-            new_value = not detailed_import
-            self.config.set("detailed_import", new_value)
-            self.logger.info(f"Changed detailed_import setting to: {new_value}")
-        elif choice == 3:
+        choice = self.choice_input("", options)
+        
+        if choice is not None and choice <= len(toggles):
+            key = toggles[choice - 1]
+            new_value = not values[key]
+            self.config.set(key, new_value)
+            if key == "profiling":
+                self.profiler.enabled = new_value
+            self.logger.info(f"Changed {key} setting to: {new_value}")
+        elif choice == clear_cache_choice:
+            removed = self.cache.invalidate()
+            print(self.ts["cache_cleared"].format(removed)); time.sleep(1)
+        elif choice == back_choice:
             self.logger.info("Returning to main menu from settings")
             return
         
         self.open_settings()
     
-    def get_xml_strings(self, file_path: str):
-        self.logger.info(f"Parsing XML file: {file_path}")
+    def get_xml_strings(self, file_path: str, streaming: bool | None = None, pool: "StringPool | None" = None,
+                        key_filter: "KeyFilter | None" = None):
+        """Parse a strings.xml into name -> text; into a StringTable over pool when one is given.
+        
+        With a key_filter only the selected names are kept. A cached parse is filtered on load;
+        a filtered parse is never cached, as it would stand in for the whole file. Archive
+        entries ("app.apk!/values/strings.xml") are always streamed and never cached.
+        """
+        archive, _ = split_archive_path(file_path)
+        if streaming is None:
+            streaming = self.config.get("streaming_xml_parse", True)
+        streaming = streaming or archive is not None
+        
+        profiler = self.profiler
+        profiler.begin("get_xml_strings", file_path)
         try:
-            tree = ET.parse(file_path, parser=None)
-            root = tree.getroot()
+            with profiler.phase("read"):
+                cached, signature = self.cache.load(file_path) if archive is None else (None, None)
+            if cached is not None:
+                if key_filter is not None:
+                    cached = {name: text for name, text in cached.items() if key_filter(name)}
+                self.report_profile(profiler.end(len(cached)))
+                return StringTable(pool, cached) if pool is not None else cached
+            
+            self.logger.info(f"Parsing XML file ({'streaming' if streaming else 'tree'} mode): {file_path}")
             strings = {}
             
-            for child in root.iter("string"):
-                name = child.get("name")
-                if name:
-                    text = child.text
-                    strings[name] = text
-                    self.logger.debug(f"Found string: {name} = {text}")
+            with profiler.phase("parse"):
+                if streaming:
+                    pairs = self.iter_xml_strings(file_path, key_filter)
+                else:
+                    tree = strings_api.parse_xml_tree(file_path)
+                    children = tree.getroot().iter("string")
+                    if key_filter is None:
+                        pairs = ((child.get("name"), child.text) for child in children)
+                    else:
+                        pairs = ((name, child.text) for child in children if key_filter(name := child.get("name")))
+                
+                sample = self.debug_sample()
+                if sample:
+                    for count, (name, text) in enumerate(pairs, 1):
+                        if name:
+                            strings[name] = text
+                            if count % sample == 0:
+                                self.logger.debug(f"Found string: {name} = {text}")
+                else:
+                    strings.update(filter(operator.itemgetter(0), pairs))
             
             self.logger.info(f"Successfully parsed {len(strings)} strings from XML file")
-            return strings
+            if key_filter is None:
+                with profiler.phase("serialize"):
+                    self.cache.store(file_path, strings, signature)
+            self.report_profile(profiler.end(len(strings)))
+            return StringTable(pool, strings) if pool is not None else strings
             
-        except ET.XMLSyntaxError as e:
+        except SyntaxError as e:  # lxml's XMLSyntaxError and ElementTree's ParseError
             self.logger.error(f"XML syntax error in file {file_path}: {str(e)}")
             raise
         except Exception as e:
             self.logger.error(f"Error parsing XML file {file_path}: {str(e)}")
             raise
     
-    def export_strings(self, file_path: str, strings: dict, export_none_strings: bool = False):
-        self.logger.info(f"Exporting {len(strings)} strings to: {file_path}")
+    def iter_xml_strings(self, file_path: str, key_filter: "KeyFilter | None" = None):
+        """Yield (name, text) for each <string> element without building the whole tree (see strings_api).
+        
+        file_path may also be an open file, or an archive entry, which is decompressed straight
+        into the parser without being extracted.
+        """
+        archive, member = split_archive_path(file_path) if isinstance(file_path, str) else (None, file_path)
+        if archive is not None:
+            return self.iter_archive_strings(archive, member, key_filter)
+        return strings_api.iter_xml_strings(file_path, key_filter)
+    
+    def iter_archive_strings(self, archive_path: str, member: str, key_filter: "KeyFilter | None" = None):
+        archive = self.open_archive(archive_path)
+        if archive.is_compiled(member):
+            yield from archive.compiled_strings(member, key_filter)
+            return
+        with archive.open(member) as source:
+            yield from strings_api.iter_xml_strings(source, key_filter)
+    
+    def open_archive(self, file_path: str):
+        """ResourceArchive of a zip-based file, opened once and kept for the other entries read from it."""
+        archive = self.archives.get(file_path)
+        if archive is None:
+            archive = self.archives[file_path] = ResourceArchive(file_path)
+        return archive
+    
+    def source_exists(self, file_path: str):
+        archive, member = split_archive_path(file_path)
+        if archive is None:
+            return os.path.exists(file_path)
+        return os.path.isfile(archive) and self.open_archive(archive).has_strings(member)
+    
+    @contextlib.contextmanager
+    def open_output(self, file_path: str, mode: str = "w"):
+        """Open an output file for writing through a temporary file next to it, moved over it atomically on success.
+        
+        With overwrite_if_changed, output whose content is byte for byte the same as the existing file is
+        dropped instead, so the file keeps its mtime and build tools see nothing to redo.
+        """
+        temp_file = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
         try:
-            exported_strings_count = 0
-            exported_none_strings_count = 0
-            skipped_none_strings_count = 0
-            
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(f"/* Generated by veydzh3r's {APP_NAME}: https://github.com/Veydzher/Translation-Tools/tree/main/Android */\n")
-                for name in sorted(strings):
-                    if strings[name] is not None:
-                        text = self.quote_unicode(strings[name])
-                        f.write(f"\"{name}\" = \"{text}\";\n")
-                        exported_strings_count += 1
-                        self.logger.debug(f"Exported string: {name}")
-                    else:
-                        if export_none_strings:
-                            f.write(f"\"{name}\" = \"\";\n")
-                            exported_none_strings_count += 1
-                            self.logger.debug(f"Exported empty string: {name}")
-                        else:
-                            skipped_none_strings_count += 1
-                            self.logger.debug(f"Skipped empty string: {name}")
+            with open(temp_file, mode, encoding=None if "b" in mode else "utf-8") as f:
+                yield f
+            if self.config.get("overwrite_if_changed", True) and self.same_content(temp_file, file_path):
+                os.remove(temp_file)
+                self.logger.info(f"Output unchanged, keeping the existing file: {file_path}")
+            else:
+                os.replace(temp_file, file_path)
+        except BaseException:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+            raise
+    
+    def same_content(self, new_file: str, old_file: str):
+        try:
+            if os.path.getsize(new_file) != os.path.getsize(old_file):
+                return False
+            # Same size, so comparing chunk by chunk settles it and stops at the first difference
+            with open(new_file, "rb") as new, open(old_file, "rb") as old:
+                while chunk := new.read(1 << 20):
+                    if chunk != old.read(len(chunk)):
+                        return False
+                return True
+        except OSError:
+            return False
+    
+    def export_strings(self, file_path: str, strings: dict, export_none_strings: bool = False, sort: bool = True,
+                       binary: bool | None = None):
+        if binary is None:
+            binary = self.config.get("binary_strings", False)
+        self.logger.info(f"Exporting {len(strings)} strings to: {file_path}{' (binary property list)' if binary else ''}")
+        profiler = self.profiler
+        profiler.begin("export_strings", file_path)
+        try:
+            with self.open_output(file_path, "wb" if binary else "w") as f:
+                exported_strings_count, exported_none_strings_count, skipped_none_strings_count = strings_api.write_strings(
+                    f, strings, export_none_strings, sort, self.config.get("convert_format_specifiers", True), binary,
+                    phase=profiler.phase)
+            sample = self.debug_sample()
+            if sample:
+                self.log_exported(strings, export_none_strings, sample)
             
             self.logger.info(f"Export completed: {exported_strings_count} strings exported, {skipped_none_strings_count} empty strings skipped")
+            self.report_profile(profiler.end(len(strings)))
             
         except Exception as e:
             self.logger.error(f"Export error for file {file_path}: {str(e)}")
+            if not self.interactive:
+                raise
             print(self.ts["export_error"].format(str(e)))
             return False
         
+        if not self.interactive:
+            return True
+        
         filename = os.path.basename(file_path)
         detailed_export = self.config.get("detailed_export")
         
@@ -277,108 +482,410 @@ class XMLtoSTRINGS:
         
         return True
     
-    def get_apple_strings(self, file_path: str):
-        self.logger.info(f"Parsing STRINGS file: {file_path}")
+    def log_exported(self, strings: dict, export_none_strings: bool, sample: int):
+        """Debug line for every sample-th exported, exported empty and skipped empty string."""
+        exported = exported_empty = skipped = 0
+        for name, text in strings.items():
+            if text is not None:
+                exported += 1
+                if exported % sample == 0:
+                    self.logger.debug(f"Exported string: {name}")
+            elif export_none_strings:
+                exported_empty += 1
+                if exported_empty % sample == 0:
+                    self.logger.debug(f"Exported empty string: {name}")
+            else:
+                skipped += 1
+                if skipped % sample == 0:
+                    self.logger.debug(f"Skipped empty string: {name}")
+    
+    def export_xml_stream(self, xml_file: str, output_file: str, export_none_strings: bool = False,
+                          sort: bool = True, memory_mb: int | None = None, key_filter: "KeyFilter | None" = None):
+        """Export a strings.xml straight from the streaming parser, without a dict of all strings.
+        
+        With sort=False every <string> is written in source order as soon as it is parsed,
+        duplicates included: the last written one wins when the file is read back, but a skipped
+        empty string does not hide an earlier definition of its key. Sorted output goes
+        through an external merge sort: runs of rendered lines up to the memory budget are
+        sorted and spilled to temporary files, then merged, keeping the last definition of each
+        key as export_strings() does. Returns (total keys, exported keys).
+        """
+        if memory_mb is None:
+            memory_mb = self.config.get("export_memory_mb", 64)
+        budget = memory_mb * 1024 * 1024
+        
+        self.logger.info(f"Streaming export of {xml_file} to {output_file} ({'sorted' if sort else 'source order'}, {memory_mb} MB budget)")
+        profiler = self.profiler
+        profiler.begin("export_xml_stream", xml_file)
+        convert_formats = self.config.get("convert_format_specifiers", True)
+        pairs = self.iter_xml_strings(xml_file, key_filter)
+        total = exported = 0
+        run = []
+        run_size = 0
+        runs = []
         try:
-            content = None
-            encoding_used = None
+            with self.open_output(output_file) as f:
+                f.write(STRINGS_HEADER)
+                while True:
+                    with profiler.phase("parse"):
+                        batch = list(itertools.islice(pairs, EXPORT_BATCH_SIZE))
+                    if not batch:
+                        break
+                    
+                    with profiler.phase("transform"):
+                        lines = []
+                        for name, text in batch:
+                            line = strings_api.strings_line(name, text, export_none_strings)
+                            if sort:
+                                # Skipped strings still take part, they may override an earlier definition
+                                run.append((name, line))
+                                run_size += STREAM_ENTRY_OVERHEAD + len(name) + (len(line) if line else 0)
+                            elif line is not None:
+                                lines.append(line)
+                            else:
+                                total += 1
+                    
+                    if not sort:
+                        total += len(lines)
+                        exported += len(lines)
+                        with profiler.phase("serialize"):
+                            chunk = strings_api.join_strings_lines(lines, convert_formats)
+                        with profiler.phase("write"):
+                            f.write(chunk)
+                    elif run_size >= budget:
+                        runs.append(self.spill_run(run))
+                        run = []
+                        run_size = 0
+                
+                if sort:
+                    total, exported = self.merge_runs(f, runs, run, convert_formats)
             
-            for encoding in ["utf-16", "utf-8"]:
+            self.logger.info(f"Streaming export completed: {exported} of {total} strings exported using {len(runs)} spilled run(s)")
+            self.report_profile(profiler.end(total))
+            return total, exported
+        finally:
+            for run_file in runs:
+                run_file.close()
+    
+    def spill_run(self, run: list):
+        """Sort a run of (name, line) pairs by name and write it to an anonymous temporary file."""
+        import tempfile
+        
+        with self.profiler.phase("transform"):
+            run.sort(key=operator.itemgetter(0))
+        with self.profiler.phase("serialize"):
+            run_file = tempfile.TemporaryFile(prefix="strings_run_")
+            # Small chunks, since the merge holds one chunk of every run in memory at a time
+            for start in range(0, len(run), SPILL_CHUNK_SIZE):
+                marshal.dump(run[start:start + SPILL_CHUNK_SIZE], run_file)
+            run_file.seek(0)
+        self.logger.debug(f"Spilled a run of {len(run)} strings")
+        return run_file
+    
+    def read_run(self, run_file):
+        while True:
+            with self.profiler.phase("serialize"):
                 try:
-                    with open(file_path, "r", encoding=encoding) as f:
-                        content = f.read()
-                        encoding_used = encoding
+                    chunk = marshal.load(run_file)
+                except EOFError:
+                    return
+            yield from chunk
+    
+    def merge_runs(self, f, runs: list, run: list, convert_formats: bool = True):
+        """Merge the spilled runs and the last in-memory one into f, return (total keys, exported keys)."""
+        with self.profiler.phase("transform"):
+            run.sort(key=operator.itemgetter(0))
+        # heapq.merge keeps equal names in run order, and runs are in source order, so the last
+        # entry of every name is its last definition
+        merged = heapq.merge(*(self.read_run(run_file) for run_file in runs), run, key=operator.itemgetter(0)) if runs else run
+        
+        total = exported = 0
+        lines = []
+        previous_name = previous_line = None
+        for name, line in merged:
+            if name != previous_name:
+                if previous_name is not None:
+                    total += 1
+                    if previous_line is not None:
+                        lines.append(previous_line)
+                        if len(lines) >= EXPORT_BATCH_SIZE:
+                            exported += len(lines)
+                            self.write_lines(f, lines, convert_formats)
+                            lines = []
+                previous_name = name
+            previous_line = line
+        
+        if previous_name is not None:
+            total += 1
+            if previous_line is not None:
+                lines.append(previous_line)
+        exported += len(lines)
+        self.write_lines(f, lines, convert_formats)
+        return total, exported
+    
+    def write_lines(self, f, lines: list, convert_formats: bool):
+        with self.profiler.phase("serialize"):
+            chunk = strings_api.join_strings_lines(lines, convert_formats)
+        with self.profiler.phase("write"):
+            f.write(chunk)
+    
+    def export_string_catalog(self, file_path: str, localizations: dict[str, dict], source_language: str):
+        """Write an Xcode String Catalog (.xcstrings) with the strings of every locale, return the key count.
+        
+        All locales share one key index, so the keys are sorted once and every key is written
+        once with all of its translations, batch by batch as in export_strings().
+        """
+        self.logger.info(f"Exporting {len(localizations)} locale(s) to string catalog: {file_path}")
+        profiler = self.profiler
+        profiler.begin("export_string_catalog", file_path)
+        dumps = json.dumps
+        resolve = escape_codec.resolve
+        locales = sorted(localizations)
+        locale_keys = [dumps(locale, ensure_ascii=False) for locale in locales]
+        
+        with profiler.phase("transform"):
+            index = {}
+            for position, locale in enumerate(locales):
+                for name, text in localizations[locale].items():
+                    texts = index.get(name)
+                    if texts is None:
+                        texts = index[name] = [None] * len(locales)
+                    texts[position] = text
+            names = sorted(index)
+        
+        with self.open_output(file_path) as f:
+            f.write(f"{{\n  \"sourceLanguage\" : {dumps(source_language)},\n  \"strings\" : {{\n")
+            for start in range(0, len(names), EXPORT_BATCH_SIZE):
+                entries = []
+                with profiler.phase("transform"):
+                    for name in names[start:start + EXPORT_BATCH_SIZE]:
+                        units = [
+                            f"        {locale_keys[position]} : {{\n          \"stringUnit\" : {{\n"
+                            f"            \"state\" : \"translated\",\n            \"value\" : {dumps(resolve(text), ensure_ascii=False)}\n"
+                            f"          }}\n        }}"
+                            for position, text in enumerate(index[name]) if text is not None
+                        ]
+                        if units:
+                            units = ",\n".join(units)
+                            entries.append(f"    {dumps(name, ensure_ascii=False)} : {{\n      \"localizations\" : {{\n{units}\n      }}\n    }}")
+                        else:
+                            entries.append(f"    {dumps(name, ensure_ascii=False)} : {{\n\n    }}")
+                
+                with profiler.phase("serialize"):
+                    chunk = (",\n" if start else "") + ",\n".join(entries)
+                    if self.config.get("convert_format_specifiers", True):
+                        chunk = escape_codec.to_apple_format(chunk)
+                with profiler.phase("write"):
+                    f.write(chunk)
+            f.write("\n  },\n  \"version\" : \"1.0\"\n}\n")
+        
+        self.logger.info(f"String catalog export completed: {len(names)} keys in {len(locales)} locale(s)")
+        self.report_profile(profiler.end(len(names)))
+        return len(names)
+    
+    def diff_xml_strings(self, old_file: str, new_file: str, key_filter: "KeyFilter | None" = None):
+        """Compare two versions of a strings.xml key by key, return (new strings, added, changed, removed).
+        
+        The old version is streamed into one hash per key, so only the new one is held as text,
+        and a single pass over the new strings sorts every key into its set.
+        """
+        self.logger.info(f"Comparing strings of {old_file} with {new_file}")
+        old_hashes = {name: hash(text) for name, text in self.iter_xml_strings(old_file, key_filter) if name}
+        strings = self.get_xml_strings(new_file, key_filter=key_filter)
+        
+        added = []
+        changed = []
+        for name, text in strings.items():
+            old_hash = old_hashes.pop(name, None)
+            if old_hash is None:
+                added.append(name)
+            elif old_hash != hash(text):
+                changed.append(name)
+        removed = list(old_hashes)
+        
+        self.logger.info(f"Found {len(added)} added, {len(changed)} changed and {len(removed)} removed strings")
+        sample = self.debug_sample()
+        for name in removed[::sample] if sample else ():
+            self.logger.debug(f"Removed string: {name}")
+        return strings, added, changed, removed
+    
+    def export_delta(self, old_file: str, new_file: str, output_file: str, export_none_strings: bool = False,
+                     key_filter: "KeyFilter | None" = None):
+        """Export only the strings added or changed in new_file since old_file, return (added, changed, removed) counts."""
+        strings, added, changed, removed = self.diff_xml_strings(old_file, new_file, key_filter)
+        delta = {name: strings[name] for name in itertools.chain(added, changed)}
+        self.export_strings(output_file, delta, export_none_strings)
+        return len(added), len(changed), len(removed)
+    
+    def get_apple_strings(self, file_path: str, pool: "StringPool | None" = None, key_filter: "KeyFilter | None" = None):
+        """Parse a .strings file into name -> text; into a StringTable over pool when one is given.
+        
+        With a key_filter the values of rejected keys are neither unescaped nor converted.
+        """
+        self.logger.info(f"Parsing STRINGS file: {file_path}")
+        profiler = self.profiler
+        profiler.begin("get_apple_strings", file_path)
+        result = {}
+        convert_formats = self.config.get("convert_format_specifiers", True)
+        sample = self.debug_sample()
+        parsed = 0
+        try:
+            with open(file_path, "rb") as f:
+                pairs, binary = strings_api.read_apple_strings(profiler.reader(f))
+                while True:
+                    with profiler.phase("parse"):
+                        batch = list(itertools.islice(pairs, EXPORT_BATCH_SIZE))
+                    if not batch:
                         break
-                except UnicodeError:
-                    continue
-            
-            if content is None:
-                raise Exception("Could not decode file with utf-16 or utf-8 encoding")
-            
-            self.logger.info(f"Successfully read file using {encoding_used} encoding")
-            
+                    
+                    with profiler.phase("transform"):
+                        keys, values = strings_api.convert_apple_batch(batch, binary, key_filter, convert_formats)
+                        if not sample:
+                            result.update(zip(keys, values))
+                            continue
+                        for unescaped_key, unescaped_value in zip(keys, values):
+                            result[unescaped_key] = unescaped_value
+                            parsed += 1
+                            if parsed % sample == 0:
+                                self.logger.debug(f"Parsed string: {unescaped_key} = {unescaped_value}")
+        
         except Exception as e:
             self.logger.error(f"Error reading STRINGS file {file_path}: {str(e)}")
+            if not self.interactive:
+                raise
             print(self.ts["strings_reading_error"].format(file_path, str(e)))
             return {}
         
-        content = re.sub(r'/\*.*?\*/', '', content, flags=re.DOTALL)
-        content = re.sub(r'//.*', '', content)
-        
-        pattern = r'"(.*?)"\s*=\s*"(.*?)"\s*;'
-        matches = re.findall(pattern, content, flags=re.DOTALL)
-        
-        result = {}
-        for key, value in matches:
-            unescaped_key = self.unquote_unicode(key)
-            unescaped_value = self.unquote_unicode(value)
-            result[unescaped_key] = unescaped_value
-            self.logger.debug(f"Parsed string: {unescaped_key} = {unescaped_value}")
-        
         self.logger.info(f"Successfully parsed {len(result)} strings from STRINGS file")
-        return result
+        self.report_profile(profiler.end(len(result)))
+        return StringTable(pool, result) if pool is not None else result
     
-    def import_strings(self, source_file: str, output_file: str, strings: dict):
+    def import_strings(self, source_file: str, output_file: str, strings: dict, patch: bool | None = None,
+                       report_dir: str | None = None, report_format: str | None = None, base: "strings_api.ImportBase | None" = None):
+        """Write source_file with the texts of strings to output_file, return the number of updated strings.
+        
+        A base from prepare_import() stands in for parsing source_file, so one parse serves
+        any number of imports; it is left open for the caller to close.
+        """
+        if report_dir is None and self.config.get("detailed_import"):
+            report_dir = self.config.get("import_report_dir") or "."
+        
         self.logger.info(f"Importing strings from {source_file} to {output_file}")
+        profiler = self.profiler
+        profiler.begin("import_strings", source_file)
+        shared = base is not None
+        report = None
         try:
-            tree = ET.parse(source_file, parser=None)
-            root = tree.getroot()
+            if report_dir is not None:
+                report = ImportReport(report_dir, report_format or self.config.get("import_report_format", "text"))
+            
+            if not shared:
+                base = self.prepare_import(source_file, patch)
+            target_base = base
+            if base.tree is not None and shared:
+                # The shared tree stays pristine for the other imports; each one updates its own clone
+                with profiler.phase("parse"):
+                    target_base = strings_api.ImportBase(base.file_path, tree=copy.deepcopy(base.tree))
             
             import_strings_count = 0
-            success_import_strings = []
-            failed_import_strings = []
-            
-            for str_obj in root.iter("string"):
-                obj_name = str_obj.get("name")
-                if obj_name in strings and obj_name:
-                    old_text = str_obj.text
-                    new_text = strings[obj_name]
-                    if old_text != new_text and old_text is not None:
-                        success_import_strings.append(f"\tKey: \"{obj_name}\"\n\tOld: {old_text}\n\tNew: {new_text}\n")
-                        str_obj.text = new_text
+            mismatch_count = 0
+            updates = []
+            validate = self.config.get("validate_placeholders", True)
+            sample = self.debug_sample()
+            
+            with profiler.phase("transform"):
+                changes = strings_api.iter_import_changes(target_base, strings, validate)
+                for compared, (status, obj_name, old_text, new_text, target) in enumerate(changes, 1):
+                    if report:
+                        report.add(status, obj_name, old_text, new_text)
+                    if status == "success":
+                        updates.append((target, new_text))
                         import_strings_count += 1
-                        self.logger.debug(f"Updated string '{obj_name}': '{old_text}' -> '{new_text}'")
-                    else:
-                        failed_import_strings.append(f"\tKey: \"{obj_name}\"\n\tOld: {old_text}\n\tNew: {new_text}\n")
+                        if sample and compared % sample == 0:
+                            self.logger.debug(f"Updated string '{obj_name}': '{old_text}' -> '{new_text}'")
+                    elif status == "mismatch":
+                        mismatch_count += 1
+                        self.logger.warning(f"Placeholder mismatch for string '{obj_name}', not imported: '{old_text}' -> '{new_text}'")
+                    elif sample and compared % sample == 0:
                         self.logger.debug(f"No change for string '{obj_name}': '{old_text}'")
+            # Counted by the iteration above, not by a second pass over the tree
+            total_strings_count = len(target_base)
             
-            self.logger.info(f"Import process completed: {import_strings_count} strings updated")
-            
-            detailed_import = self.config.get("detailed_import")
+            self.logger.info(f"Import process completed: {import_strings_count} strings updated, {mismatch_count} placeholder mismatches")
             
-            if detailed_import:
-                if success_import_strings:
-                    success_file = "success_import_strings.txt"
-                    with open(success_file, "w+", encoding="utf-8") as sf:
-                        sf.write("Successfully imported the following strings:\n")
-                        for ses in success_import_strings:
-                            sf.write(f"{ses}\n")
-                    self.logger.info(f"Detailed success log written to: {success_file}")
-                
-                if failed_import_strings:
-                    failed_file = "failed_import_strings.txt"
-                    with open(failed_file, "w+", encoding="utf-8") as ff:
-                        ff.write("Failed to import the following strings:\n")
-                        for fis in failed_import_strings:
-                            ff.write(f"{fis}\n")
-                    self.logger.info(f"Detailed failure log written to: {failed_file}")
+            if import_strings_count != 0:
+                with profiler.phase("write"):
+                    with self.open_output(output_file, "wb") as f:
+                        strings_api.write_import(target_base, updates, f)
+                        if not shared:
+                            # Unmapped before the output is moved into place: Windows cannot
+                            # replace a mapped file, and the output may be the source itself
+                            base.close()
+                if target_base.tree is None:
+                    self.logger.info(f"Patched {len(updates)} string(s) in place")
+            self.report_profile(profiler.end(total_strings_count))
             
             if import_strings_count != 0:
-                tree.write(output_file, encoding="utf-8", xml_declaration=True, pretty_print=True)
                 output_filename = os.path.basename(output_file)
                 self.logger.info(f"Updated XML file saved as: {output_file}")
+                if not self.interactive:
+                    return import_strings_count
                 self.print_box([
-                    self.ts["total_strings"].format(len(root.xpath('.//string'))),
+                    self.ts["total_strings"].format(total_strings_count),
                     self.ts["imported_strings"].format(import_strings_count),
+                    *([self.ts["placeholder_mismatches"].format(mismatch_count)] if mismatch_count else []),
                     self.ts["strings_saved"].format(output_filename)
                 ])
             else:
                 self.logger.warning("No strings were updated during import")
-                print(self.ts["no_strings_to_update"])
+                if self.interactive:
+                    print(self.ts["no_strings_to_update"])
+            
+            return import_strings_count
         
         except Exception as e:
             self.logger.error(f"Import error: {str(e)}")
+            if not self.interactive:
+                raise
             print(self.ts["import_error"].format(str(e)))
+        
+        finally:
+            if base is not None and not shared:
+                base.close()
+            if report is not None:
+                report.close()
+    
+    def prepare_import(self, source_file: str, patch: bool | None = None):
+        """Read source_file once for import_strings(): as a mapped offset index when it can be patched, else as a tree."""
+        if patch is None:
+            patch = self.config.get("patch_import", True)
+        profiler = self.profiler
+        if patch:
+            with profiler.phase("read"):
+                source = strings_api.map_xml_source(source_file)
+            with profiler.phase("parse"):
+                index = strings_api.index_xml_strings(source) if source is not None else None
+            if index is not None:
+                return strings_api.ImportBase(source_file, source, index)
+            
+            self.logger.info("Source XML cannot be patched in place, falling back to a full rewrite")
+            if source is not None:
+                source.close()
+        with profiler.phase("parse"):
+            return strings_api.ImportBase(source_file, tree=strings_api.parse_xml_tree(source_file))
+    
+    def report_profile(self, metrics: dict | None):
+        if not metrics or not self.interactive:
+            return
+        self.print_box(self.format_profile([metrics]) + [self.ts["profile_saved"].format(self.profiler.metrics_file)])
+    
+    def format_profile(self, records: list[dict]):
+        lines = []
+        for metrics in records:
+            lines.append(self.ts["profile_operation"].format(metrics["operation"], metrics["strings"], metrics["seconds"], metrics["strings_per_second"]))
+            for name, phase in metrics["phases"].items():
+                lines.append(self.ts["profile_phase"].format(name, phase["seconds"], phase["strings_per_second"], phase["peak_memory_bytes"] / (1024 * 1024)))
+        return lines
     
     def choice_input(self, msg: str, options: dict[int, str]):
         try:
@@ -396,8 +903,14 @@ class XMLtoSTRINGS:
             self.logger.warning(f"Invalid menu choice entered")
             return None
     
-    def file_input(self, kind: str, extension: str, default: str = ""):
+    def file_input(self, kind: str, extension: str, default: str = "", archive_entries: bool = True):
         def esc_input(prompt: str):
+            readchar = load_readchar()
+            if readchar is None:
+                # No single-key input: read a whole line, where a lone ESC still cancels
+                line = input(prompt).strip()
+                return None if line == "\x1b" else line.strip('"')
+            
             print(prompt, end="", flush=True)
             buffer = ""
             while True:
@@ -435,15 +948,14 @@ class XMLtoSTRINGS:
                     self.logger.warning(f"Invalid filename provided: {file_path}")
                     raise InvalidFileExtension(self.ts["file_input_new_invalid"])
                 
-                original_path = file_path
-                counter = 1
-                while os.path.exists(file_path):
-                    file = os.path.basename(original_path)
+                # An existing file is overwritten in place (and left alone when the output matches it)
+                # unless overwrite_if_changed is off: then the output goes to the first free "name - Copy (n)"
+                if os.path.exists(file_path) and not self.config.get("overwrite_if_changed", True):
+                    directory, file = os.path.split(file_path)
                     name, ext = os.path.splitext(file)
-                    file_path = f"{name} - Copy{f' ({counter})' if counter > 1 else ''}{ext}"
-                    counter += 1
-                    
-                if file_path != original_path:
+                    taken = set(os.listdir(directory or "."))
+                    copies = (f"{name} - Copy{f' ({counter})' if counter > 1 else ''}{ext}" for counter in itertools.count(1))
+                    file_path = os.path.join(directory, next(copy for copy in copies if copy not in taken))
                     self.logger.info(f"File exists, using alternate name: {file_path}")
             
             elif kind == "existing":
@@ -453,7 +965,12 @@ class XMLtoSTRINGS:
                     self.logger.info("User cancelled file input (ESC pressed)")
                     raise UserCancelled
                     
-                if not os.path.exists(file_path):
+                if not archive_entries and split_archive_path(file_path)[0] is not None:
+                    # Imports write the source back out, which only a real file can provide
+                    self.logger.warning(f"Archive entry rejected as import source: {file_path}")
+                    raise InvalidFileExtension(self.ts["file_input_existing_archive"].format(display_ext))
+                    
+                if not self.source_exists(file_path):
                     self.logger.warning(f"File not found: {file_path}")
                     raise FileNotFoundError(self.ts["file_input_existing_not_found"].format(display_ext))
                     
@@ -466,10 +983,17 @@ class XMLtoSTRINGS:
         except (FileNotFoundError, InvalidFileExtension) as e:
             print(str(e))
             time.sleep(1)
-            return self.file_input(kind, extension, default)
+            return self.file_input(kind, extension, default, archive_entries)
         except UserCancelled:
             raise
     
+    def wait_key(self):
+        readchar = load_readchar()
+        if readchar is None:
+            input()
+        else:
+            readchar.readkey()
+    
     def clear(self):
         os.system('cls' if os.name == 'nt' else 'clear')
 
@@ -518,49 +1042,10 @@ class XMLtoSTRINGS:
         print(bottom_border)
 
     def quote_unicode(self, s: str):
-        if not s:
-            return s
-        
-        if s.startswith('"') and s.endswith('"'):
-            s = s[1:-1]
-        
-        # s = s.replace("\\", "\\\\")  # Backslash must be first
-        # s = s.replace("\"", "\\\"")  # Double quote
-        # s = s.replace("\'", "\\'")   # Single quote
-        s = s.replace("\a", "\\a")   # Bell
-        s = s.replace("\b", "\\b")   # Backspace
-        s = s.replace("\f", "\\f")   # Form feed
-        s = s.replace("\n", "\\n")   # Newline
-        s = s.replace("\r", "\\r")   # Carriage return
-        s = s.replace("\t", "\\t")   # Tab
-        s = s.replace("\v", "\\v")   # Vertical tab
-        s = s.replace("\0", "\\0")   # Null character
-        
-        return s
+        return escape_codec.quote(s)
 
     def unquote_unicode(self, s: str):
-        if not s:
-            return s
-        
-        s = s.replace("\\0", "\0")
-        s = s.replace("\\v", "\v")
-        s = s.replace("\\t", "\t")
-        s = s.replace("\\r", "\r")
-        s = s.replace("\\n", "\n")
-        s = s.replace("\\f", "\f")
-        s = s.replace("\\b", "\b")
-        s = s.replace("\\a", "\a")
-        # s = s.replace("\\'", "'")
-        # s = s.replace('\\"', '"')
-        # s = s.replace("\\\\", "\\")
-        
-        if "  " in s or "'" in s or "\n" in s or "\r" in s or "\t" in s or (s and (s[0] == " " or s[-1] == " ")):
-            s = f'"{s}"'
-        
-        if s and s[0] == "?":
-            s = f"\\{s}"
-        
-        return s
+        return escape_codec.unquote(s)
 
 class Config:
     def __init__(self, config_file="config.json", config_folder=f"veydzh3r\\{APP_NAME}"):
@@ -569,7 +1054,7 @@ class Config:
         self.load()
     
     def get_config_path(self, file, folder):
-        if platform.system() == "Windows":
+        if sys.platform == "win32":
             base_dir = Path(os.getenv("APPDATA", Path.home() / "AppData" / "Roaming"))
         else:
             base_dir = Path.home() / ".config"
@@ -596,6 +1081,20 @@ class Config:
         return {
             "detailed_export": False,
             "detailed_import": False,
+            "streaming_xml_parse": True,
+            "patch_import": True,
+            "convert_format_specifiers": True,
+            "validate_placeholders": True,
+            "binary_strings": False,
+            "overwrite_if_changed": True,
+            "profiling": False,
+            "profile_metrics_file": "",
+            "import_report_dir": "",
+            "import_report_format": "text",
+            "parse_cache": True,
+            "parse_cache_max_mb": 256,
+            "export_memory_mb": 64,
+            "debug_sample_every": 1,
             "log_level": "INFO"
         }
     
@@ -613,7 +1112,1562 @@ class Config:
         self.config[key] = value
         self.save()
 
+class PhaseProfiler:
+    """Wall time, throughput and peak traced memory per pipeline phase of one operation.
+    
+    Phases nest: time spent in an inner phase (e.g. "read" inside "parse") is not counted
+    towards the outer one. Peak memory comes from tracemalloc, so it covers Python objects
+    only (not lxml's C heap) and slows allocations down while profiling is on.
+    """
+    
+    PHASES = ("read", "parse", "transform", "serialize", "write")
+    
+    def __init__(self, enabled: bool, metrics_file: str):
+        self._tracing = False
+        self.enabled = enabled
+        self.metrics_file = metrics_file
+        self.records = []
+        self.operation = None
+        self._noop = contextlib.nullcontext()
+    
+    @property
+    def enabled(self):
+        return self._enabled
+    
+    @enabled.setter
+    def enabled(self, enabled: bool):
+        self._enabled = enabled
+        # Tracing started for profiling would keep slowing every allocation down
+        if not enabled and self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+    
+    def begin(self, operation: str, file_path: str):
+        if not self.enabled:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        self.operation = {"operation": operation, "file": os.path.abspath(file_path), "start": time.perf_counter(), "phases": {}}
+        self.stack = []
+    
+    def phase(self, name: str):
+        if not self.enabled or self.operation is None:
+            return self._noop
+        return self._measure(name)
+    
+    def reader(self, f):
+        """f itself, or while profiling a wrapper whose reads count towards the "read" phase."""
+        if not self.enabled or self.operation is None:
+            return f
+        return PhaseReader(f, self)
+    
+    @contextlib.contextmanager
+    def _measure(self, name: str):
+        phases = self.operation["phases"]
+        now = time.perf_counter()
+        if self.stack:
+            outer, outer_start, outer_peak = self.stack[-1]
+            phases[outer]["seconds"] += now - outer_start
+            # The peak is reset for the inner phase below, so the outer one's so far is kept aside
+            self.stack[-1] = (outer, outer_start, max(outer_peak, tracemalloc.get_traced_memory()[1]))
+        tracemalloc.reset_peak()
+        self.stack.append((name, now, 0))
+        phases.setdefault(name, {"seconds": 0.0, "peak_memory_bytes": 0})
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            _, start, peak = self.stack.pop()
+            phases[name]["seconds"] += now - start
+            phases[name]["peak_memory_bytes"] = max(phases[name]["peak_memory_bytes"], peak, tracemalloc.get_traced_memory()[1])
+            if self.stack:
+                outer, _, outer_peak = self.stack[-1]
+                self.stack[-1] = (outer, now, outer_peak)
+    
+    def end(self, strings_count: int):
+        """Finish the current operation, append its metrics to the metrics file and return them."""
+        if not self.enabled or self.operation is None:
+            return None
+        
+        operation, self.operation = self.operation, None
+        seconds = time.perf_counter() - operation.pop("start")
+        phases = {name: operation["phases"][name] for name in self.PHASES if name in operation["phases"]}
+        for phase in phases.values():
+            phase["strings_per_second"] = strings_count / phase["seconds"] if phase["seconds"] else 0.0
+        
+        metrics = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "operation": operation["operation"],
+            "file": operation["file"],
+            "strings": strings_count,
+            "seconds": seconds,
+            "strings_per_second": strings_count / seconds if seconds else 0.0,
+            "phases": phases
+        }
+        try:
+            with open(self.metrics_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(metrics) + "\n")
+        except OSError as e:
+            logging.getLogger(__name__).warning(f"Could not write profiling metrics to {self.metrics_file}: {str(e)}")
+        
+        self.records.append(metrics)
+        return metrics
+    
+    def drain(self):
+        records, self.records = self.records, []
+        return records
+
+class PhaseReader:
+    """A binary file whose read() calls are timed as the "read" phase of a PhaseProfiler."""
+    
+    __slots__ = ("file", "profiler", "name")
+    
+    def __init__(self, file, profiler: PhaseProfiler):
+        self.file = file
+        self.profiler = profiler
+        self.name = getattr(file, "name", None)
+    
+    def read(self, size: int = -1):
+        with self.profiler.phase("read"):
+            return self.file.read(size)
+
+class ImportReport:
+    """Detailed import log, written entry by entry through buffered files while import_strings runs."""
+    
+    FORMATS = ("text", "jsonl")
+    TEXT_HEADERS = {
+        "success": "Successfully imported the following strings:\n",
+        "failed": "Failed to import the following strings:\n",
+        "mismatch": "Not imported because the placeholders do not match the source:\n"
+    }
+    
+    def __init__(self, report_dir: str, report_format: str = "text"):
+        if report_format not in self.FORMATS:
+            raise ValueError(f"Unknown import report format: {report_format} (expected one of {', '.join(self.FORMATS)})")
+        self.logger = logging.getLogger(__name__)
+        self.report_dir = report_dir
+        self.report_format = report_format
+        self.files = {}
+    
+    def add(self, status: str, key: str, old_text: str | None, new_text: str | None):
+        if self.report_format == "jsonl":
+            f = self.open("import_report.jsonl")
+            f.write(json.dumps({"status": status, "key": key, "old": old_text, "new": new_text}, ensure_ascii=False))
+            f.write("\n")
+        else:
+            f = self.open(f"{status}_import_strings.txt", self.TEXT_HEADERS[status])
+            f.write(f"\tKey: \"{key}\"\n\tOld: {old_text}\n\tNew: {new_text}\n\n")
+    
+    def open(self, filename: str, header: str = ""):
+        f = self.files.get(filename)
+        if f is None:
+            os.makedirs(self.report_dir, exist_ok=True)
+            f = open(os.path.join(self.report_dir, filename), "w", encoding="utf-8", buffering=1 << 16)
+            f.write(header)
+            self.files[filename] = f
+        return f
+    
+    def close(self):
+        for f in self.files.values():
+            f.close()
+            self.logger.info(f"Detailed import report written to: {f.name}")
+        self.files.clear()
+
+class KeyFilter:
+    """Include/exclude selection of string names, checked by the parsers before a string's text is touched.
+    
+    A pattern is a regex when written as re:<regex> (searched anywhere in the name), a glob when
+    it holds *, ? or [, and a name prefix otherwise. The prefixes are kept sorted, without those
+    extending a shorter one: the only prefix that can then match a name is the last one not
+    greater than it, found by bisection however many there are. Globs and regexes are each
+    merged into one compiled pattern.
+    """
+    
+    __slots__ = ("include", "exclude")
+    
+    def __init__(self, include: list[str] = (), exclude: list[str] = ()):
+        self.include = self.compile(include) if include else None
+        self.exclude = self.compile(exclude) if exclude else None
+    
+    @staticmethod
+    def compile(patterns: list[str]):
+        prefixes, globs, regexes = [], [], []
+        for pattern in patterns:
+            if pattern.startswith("re:"):
+                regexes.append(f"(?:{re.compile(pattern[3:]).pattern})")
+            elif any(char in pattern for char in "*?["):
+                globs.append(fnmatch.translate(pattern))
+            else:
+                prefixes.append(pattern)
+        
+        index = []
+        for prefix in sorted(set(prefixes)):
+            if not index or not prefix.startswith(index[-1]):
+                index.append(prefix)
+        return (index, re.compile("|".join(globs)) if globs else None, re.compile("|".join(regexes)) if regexes else None)
+    
+    @staticmethod
+    def matches(compiled: tuple, name: str):
+        prefixes, glob, regex = compiled
+        if prefixes:
+            i = bisect.bisect_right(prefixes, name)
+            if i and name.startswith(prefixes[i - 1]):
+                return True
+        return bool(glob is not None and glob.match(name) or regex is not None and regex.search(name))
+    
+    def __call__(self, name: str | None):
+        if not name:
+            return False
+        if self.include is not None and not self.matches(self.include, name):
+            return False
+        return self.exclude is None or not self.matches(self.exclude, name)
+
+class StringPool:
+    """Key names and short texts shared by the StringTables of one working set, such as the
+    locales of one res/ folder.
+    
+    Every distinct name is stored once and numbered, so a key present in twenty locales is a
+    single str. Short texts ("OK", "Cancel") are shared too; longer ones are nearly always
+    unique and are kept as they are.
+    """
+    
+    __slots__ = ("names", "name_ids", "texts", "lock")
+    
+    def __init__(self):
+        self.names = []
+        self.name_ids = {}
+        self.texts = {}
+        self.lock = threading.Lock()
+    
+    def add_names(self, names):
+        """Number the names not seen before; names must be free of duplicates."""
+        name_ids = self.name_ids
+        with self.lock:
+            new_names = list(itertools.filterfalse(name_ids.__contains__, names))
+            # Listed before they are numbered: a number found in name_ids always resolves
+            self.names.extend(new_names)
+            name_ids.update(zip(new_names, itertools.count(len(self.names) - len(new_names))))
+    
+    def share_texts(self, texts):
+        shared = self.texts.setdefault
+        return [text if text is None or len(text) > SHARED_TEXT_LENGTH else shared(text, text) for text in texts]
+    
+    def __len__(self):
+        return len(self.names)
+
+class StringTable(collections.abc.Mapping):
+    """Read-only name -> text mapping of one parsed file, stored as columns over a StringPool.
+    
+    Rows keep the source order: an array of name numbers and a list of texts. A second array,
+    indexed by name number, holds the row of every name of the pool (-1 when absent), so a
+    lookup costs one dict probe in the pool plus two array reads.
+    """
+    
+    __slots__ = ("pool", "key_column", "text_column", "rows")
+    
+    def __init__(self, pool: StringPool, strings: dict):
+        pool.add_names(strings)
+        self.pool = pool
+        self.key_column = array.array("I", map(pool.name_ids.__getitem__, strings))
+        self.text_column = pool.share_texts(strings.values())
+        
+        rows = array.array("i", [-1]) * len(pool.names)
+        for row, key in enumerate(self.key_column):
+            rows[key] = row
+        self.rows = rows
+    
+    def row(self, name: str):
+        key = self.pool.name_ids.get(name, -1)
+        return self.rows[key] if -1 < key < len(self.rows) else -1
+    
+    def __getitem__(self, name: str):
+        row = self.row(name)
+        if row < 0:
+            raise KeyError(name)
+        return self.text_column[row]
+    
+    def __contains__(self, name):
+        return self.row(name) >= 0
+    
+    def get(self, name: str, default=None):
+        row = self.row(name)
+        return self.text_column[row] if row >= 0 else default
+    
+    def __len__(self):
+        return len(self.key_column)
+    
+    def __iter__(self):
+        return map(self.pool.names.__getitem__, self.key_column)
+    
+    def items(self):
+        return StringTableItems(self)
+    
+    def values(self):
+        return StringTableValues(self)
+    
+    def __repr__(self):
+        return f"StringTable({len(self)} strings)"
+
+class StringTableItems(collections.abc.ItemsView):
+    __slots__ = ()
+    
+    def __iter__(self):
+        return zip(self._mapping, self._mapping.text_column)
+
+class StringTableValues(collections.abc.ValuesView):
+    __slots__ = ()
+    
+    def __iter__(self):
+        return iter(self._mapping.text_column)
+
+class ParseCache:
+    """Parsed XML strings stored on disk, keyed by source path, size, mtime and content hash."""
+    
+    MAGIC = b"XSPC"
+    FORMAT_VERSION = 1
+    # magic, format version, marshal version, source size, source mtime (ns), source content hash
+    HEADER = struct.Struct("<4sBBQq16s")
+    
+    def __init__(self, config: Config, cache_folder=f"veydzh3r\\{APP_NAME}"):
+        self.logger = logging.getLogger(__name__)
+        self.enabled = config.get("parse_cache", True)
+        self.max_size = int(config.get("parse_cache_max_mb", 256)) * 1024 * 1024
+        self.cache_dir = config.get_config_path("parse_cache", cache_folder)
+        self.cache_dir.mkdir(exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+    
+    def entry_path(self, file_path: str):
+        key = hashlib.blake2b(os.path.abspath(file_path).encode("utf-8"), digest_size=16).hexdigest()
+        return self.cache_dir / f"{key}.bin"
+    
+    def hash_file(self, file_path: str):
+        digest = hashlib.blake2b(digest_size=16)
+        with open(file_path, "rb") as f:
+            while chunk := f.read(1 << 20):
+                digest.update(chunk)
+        return digest.digest()
+    
+    def load(self, file_path: str):
+        """Return (strings, signature); strings is None on a miss and signature is then needed by store()."""
+        if not self.enabled:
+            return None, None
+        
+        stat = os.stat(file_path)
+        entry = self.entry_path(file_path)
+        content_hash = None
+        try:
+            with open(entry, "rb") as f:
+                magic, version, marshal_version, size, mtime_ns, stored_hash = self.HEADER.unpack(f.read(self.HEADER.size))
+                valid = (magic, version, marshal_version, size) == (self.MAGIC, self.FORMAT_VERSION, marshal.version, stat.st_size)
+                if valid and mtime_ns != stat.st_mtime_ns:
+                    # Touched but possibly unchanged (checkout, copy): fall back to the content hash
+                    content_hash = self.hash_file(file_path)
+                    valid = content_hash == stored_hash
+                strings = marshal.loads(f.read()) if valid else None
+            
+            if strings is not None:
+                if mtime_ns != stat.st_mtime_ns:
+                    with open(entry, "r+b") as f:
+                        f.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, marshal.version, stat.st_size, stat.st_mtime_ns, content_hash))
+                os.utime(entry)  # Entry mtime doubles as the LRU timestamp
+                self.hits += 1
+                self.logger.info(f"Parse cache hit for {file_path} ({len(strings)} strings, hits: {self.hits}, misses: {self.misses})")
+                return strings, None
+        except FileNotFoundError:
+            pass
+        except (OSError, struct.error, ValueError, EOFError, TypeError) as e:
+            self.logger.warning(f"Ignoring unreadable parse cache entry {entry}: {str(e)}")
+        
+        self.misses += 1
+        self.logger.info(f"Parse cache miss for {file_path} (hits: {self.hits}, misses: {self.misses})")
+        # Hash before the caller parses, so a file edited mid-parse can never be stored under its new hash
+        return None, (stat.st_size, stat.st_mtime_ns, content_hash or self.hash_file(file_path))
+    
+    def store(self, file_path: str, strings: dict, signature: tuple | None):
+        if not self.enabled or signature is None:
+            return
+        
+        size, mtime_ns, content_hash = signature
+        entry = self.entry_path(file_path)
+        temp_entry = entry.with_name(f"{entry.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(temp_entry, "wb") as f:
+                f.write(self.HEADER.pack(self.MAGIC, self.FORMAT_VERSION, marshal.version, size, mtime_ns, content_hash))
+                f.write(marshal.dumps(strings))
+            os.replace(temp_entry, entry)
+            self.logger.debug(f"Stored parse cache entry {entry} for {file_path}")
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not write parse cache entry for {file_path}: {str(e)}")
+            temp_entry.unlink(missing_ok=True)
+            return
+        
+        self.evict()
+    
+    def evict(self):
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for item in it:
+                if item.name.endswith(".bin"):
+                    try:
+                        stat = item.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, item.path))
+        
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                os.remove(path)
+                self.logger.info(f"Evicted parse cache entry {path} ({size} bytes)")
+            except FileNotFoundError:
+                pass
+            total -= size
+    
+    def invalidate(self, file_paths: list[str] | None = None):
+        """Remove the cached results of the given source files, or the whole cache. Returns the number removed."""
+        if file_paths:
+            entries = [self.entry_path(file_path) for file_path in file_paths]
+        else:
+            entries = [Path(item.path) for item in os.scandir(self.cache_dir) if item.name.endswith((".bin", ".tmp"))]
+        
+        removed = 0
+        for entry in entries:
+            try:
+                entry.unlink()
+                removed += 1
+            except FileNotFoundError:
+                pass
+        
+        self.logger.info(f"Invalidated {removed} parse cache entries")
+        return removed
+
+class ResourceArchive:
+    """String resources of a zip-based archive (APK, AAR, zipped res/ folder), read without extracting it.
+    
+    values*/strings.xml entries are decompressed one at a time, straight into the parser. APKs
+    hold their strings compiled in resources.arsc instead: its string entries are indexed once
+    and listed as values*/strings.xml entries at the archive root, and their texts are decoded
+    from the string pool only when such an entry is read.
+    """
+    
+    COMPILED_TABLE = "resources.arsc"
+    
+    def __init__(self, file_path: str):
+        import zipfile
+        
+        self.logger = logging.getLogger(__name__)
+        self.file_path = file_path
+        self.zip = zipfile.ZipFile(file_path)
+        self.entries = {name for name in self.zip.namelist() if self.is_strings_entry(name)}
+        self.compiled = None
+        self.table = None
+        self.strings = None
+        self.lock = threading.Lock()
+    
+    def is_strings_entry(self, name: str):
+        folder, _, file = name.rpartition("/")
+        folder = folder.rpartition("/")[2]
+        return file == "strings.xml" and (folder == "values" or folder.startswith("values-"))
+    
+    def values_dirs(self):
+        """Archive folders holding a strings.xml, from the entries or else from resources.arsc."""
+        if self.entries:
+            return sorted(name.rpartition("/")[0] for name in self.entries)
+        return sorted(self.compiled_table())
+    
+    def has_strings(self, member: str):
+        return member in self.entries or self.is_compiled(member)
+    
+    def is_compiled(self, member: str):
+        folder, _, file = member.rpartition("/")
+        return member not in self.entries and file == "strings.xml" and folder in self.compiled_table()
+    
+    def open(self, member: str):
+        return self.zip.open(member)
+    
+    def compiled_strings(self, member: str, key_filter: "KeyFilter | None" = None):
+        """Yield (name, text) of a compiled values folder; texts are turned back into Android resource text."""
+        read_string = self.pool_string
+        for name, index in self.compiled_table()[member.rpartition("/")[0]]:
+            if key_filter is None or key_filter(name):
+                yield name, escape_codec.unresolve(read_string(self.table, self.strings, index)) or None
+    
+    def compiled_table(self):
+        """{values folder: [(name, string pool index)]} of resources.arsc, indexed on first use; empty without one."""
+        with self.lock:
+            if self.compiled is None:
+                self.compiled = self.index_compiled_table() if self.COMPILED_TABLE in self.zip.namelist() else {}
+        return self.compiled
+    
+    def index_compiled_table(self):
+        data = self.table = self.zip.read(self.COMPILED_TABLE)
+        chunk_type, header_size, size = ARSC_CHUNK.unpack_from(data, 0)
+        if chunk_type != ARSC_TABLE:
+            raise ValueError(f"{self.file_path}: {self.COMPILED_TABLE} is not a compiled resource table")
+        
+        folders = {}
+        pos = header_size
+        while pos < size:
+            chunk_type, _, chunk_size = ARSC_CHUNK.unpack_from(data, pos)
+            if chunk_type == ARSC_STRING_POOL:
+                self.strings = self.read_string_pool(data, pos)
+            elif chunk_type == ARSC_PACKAGE:
+                self.index_package(data, pos, folders)
+            pos += chunk_size
+        self.logger.info(f"Indexed {sum(map(len, folders.values()))} compiled strings in {len(folders)} locale(s) of {self.file_path}")
+        return folders
+    
+    def index_package(self, data: bytes, pos: int, folders: dict):
+        _, header_size, size = ARSC_CHUNK.unpack_from(data, pos)
+        # After the package id and its UTF-16 name: offsets of the type and key name pools
+        type_strings, _, key_strings = struct.unpack_from("<III", data, pos + 268)
+        types = self.read_string_pool(data, pos + type_strings)
+        keys = self.read_string_pool(data, pos + key_strings)
+        string_type = next((index + 1 for index in range(len(types[0])) if self.pool_string(data, types, index) == "string"), None)
+        if string_type is None:
+            return
+        
+        chunk = pos + header_size
+        while chunk < pos + size:
+            chunk_type, _, chunk_size = ARSC_CHUNK.unpack_from(data, chunk)
+            if chunk_type == ARSC_TYPE and data[chunk + 8] == string_type:
+                self.index_type(data, chunk, keys, folders)
+            chunk += chunk_size
+    
+    def index_type(self, data: bytes, pos: int, keys: tuple, folders: dict):
+        _, header_size, _ = ARSC_CHUNK.unpack_from(data, pos)
+        flags = data[pos + 9]
+        count, entries_start, config_size = struct.unpack_from("<III", data, pos + 12)
+        folder = self.config_folder(data[pos + 20:pos + 20 + config_size])
+        if folder is None:
+            self.logger.debug(f"Skipping compiled strings with non-locale qualifiers in {self.file_path}")
+            return
+        
+        if flags & 0x01:  # sparse: (entry index, offset / 4) pairs
+            offsets = [offset * 4 for offset in struct.unpack_from(f"<{2 * count}H", data, pos + header_size)[1::2]]
+        elif flags & 0x02:  # 16-bit offsets / 4
+            offsets = [offset * 4 for offset in struct.unpack_from(f"<{count}H", data, pos + header_size) if offset != 0xFFFF]
+        else:
+            offsets = [offset for offset in struct.unpack_from(f"<{count}I", data, pos + header_size) if offset != 0xFFFFFFFF]
+        
+        strings = folders.setdefault(folder, [])
+        entries = pos + entries_start
+        for offset in offsets:
+            entry = entries + offset
+            size, entry_flags, key = struct.unpack_from("<HHI", data, entry)
+            if entry_flags & 0x08:  # compact entry: key index in place of the size, value type in the flags
+                key, data_type, value = size, entry_flags >> 8, key
+            elif entry_flags & 0x01:  # bag of values (plurals, string arrays)
+                continue
+            else:
+                data_type, value = struct.unpack_from("<3xBI", data, entry + size)
+            if data_type == 0x03:  # string
+                strings.append((self.pool_string(data, keys, key), value))
+    
+    def config_folder(self, config: bytes):
+        """Android values folder name of a locale-only configuration, None for any other qualifier (night, v21, sw600dp...)."""
+        config = config.ljust(64, b"\0")
+        if any(config[4:8]) or any(config[12:36]) or any(config[48:52]):
+            return None
+        
+        language = self.locale_code(config[8:10], "a")
+        if not language:
+            return "values"
+        region = self.locale_code(config[10:12], "0")
+        script = "" if config[52] else config[36:40].rstrip(b"\0").decode("ascii")
+        variant = config[40:48].rstrip(b"\0").decode("ascii")
+        if not script and not variant and len(language) == 2:
+            return f"values-{language}-r{region}" if region else f"values-{language}"
+        return "values-b+" + "+".join(filter(None, (language, script, region, variant)))
+    
+    def locale_code(self, code: bytes, first: str):
+        if not code[0]:
+            return ""
+        if not code[0] & 0x80:
+            return code.decode("ascii")
+        # Three letters or digits packed into five bits each
+        high, low = code
+        base = ord(first)
+        return "".join(map(chr, (base + (low & 0x1F), base + ((low & 0xE0) >> 5) + ((high & 0x03) << 3), base + ((high & 0x7C) >> 2))))
+    
+    def read_string_pool(self, data: bytes, pos: int):
+        """(string offsets, position of the string data, UTF-8 flag) of the string pool chunk at pos."""
+        _, header_size, _ = ARSC_CHUNK.unpack_from(data, pos)
+        count, _, flags, strings_start = struct.unpack_from("<IIII", data, pos + 8)
+        return struct.unpack_from(f"<{count}I", data, pos + header_size), pos + strings_start, bool(flags & 0x100)
+    
+    def pool_string(self, data: bytes, pool: tuple, index: int):
+        offsets, start, utf8 = pool
+        pos = start + offsets[index]
+        if utf8:
+            # UTF-16 length, then UTF-8 byte length, each one or two bytes
+            pos += 2 if data[pos] & 0x80 else 1
+            length = data[pos]
+            if length & 0x80:
+                length = (length & 0x7F) << 8 | data[pos + 1]
+                pos += 1
+            return data[pos + 1:pos + 1 + length].decode("utf-8")
+        
+        length = int.from_bytes(data[pos:pos + 2], "little")
+        pos += 2
+        if length & 0x8000:
+            length = (length & 0x7FFF) << 16 | int.from_bytes(data[pos:pos + 2], "little")
+            pos += 2
+        return data[pos:pos + 2 * length].decode("utf-16-le")
+
+class BatchConverter:
+    """Headless conversion of every values*/strings.xml locale found under a res/ tree."""
+    
+    LEGACY_LANGUAGE_CODES = {"in": "id", "iw": "he", "ji": "yi"}
+    ANDROID_LANGUAGE_CODES = {code: legacy for legacy, code in LEGACY_LANGUAGE_CODES.items()}
+    # Qualifiers that look like language codes: the car UI mode and HDR screens
+    NON_LOCALE_QUALIFIERS = {"car", "hdr"}
+    SKIPPED_DIRS = {"build", "node_modules"}
+    
+    def __init__(self, app: XMLtoSTRINGS, jobs: int | None = None, table: str = "Localizable", profile: bool = False):
+        self.app = app
+        self.logger = app.logger
+        self.jobs = jobs or os.cpu_count() or 1
+        self.table = table
+        self.profile = profile or app.profiler.enabled
+        app.profiler.enabled = self.profile
+    
+    def find_locale_dirs(self, root: str):
+        """Yield (values_dir, apple_locale) for every values*/ folder holding a strings.xml, also inside a zip-based archive."""
+        if os.path.isfile(root):
+            import zipfile
+            
+            try:
+                folders = self.app.open_archive(root).values_dirs()
+            except (OSError, ValueError, zipfile.BadZipFile) as e:
+                self.logger.warning(f"Cannot read archive {root}: {str(e)}")
+                return
+            for folder in folders:
+                locale = self.apple_locale(folder.rpartition("/")[2])
+                if locale is None:
+                    self.logger.debug(f"Skipping non-locale resource folder: {root}{ARCHIVE_SEPARATOR}{folder}")
+                else:
+                    yield f"{root}{ARCHIVE_SEPARATOR}{folder}", locale
+            return
+        
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if not entry.is_dir(follow_symlinks=False):
+                            continue
+                        if entry.name.startswith(".") or entry.name in self.SKIPPED_DIRS:
+                            continue
+                        if entry.name == "values" or entry.name.startswith("values-"):
+                            locale = self.apple_locale(entry.name)
+                            if locale is None:
+                                self.logger.debug(f"Skipping non-locale resource folder: {entry.path}")
+                            elif os.path.isfile(os.path.join(entry.path, "strings.xml")):
+                                yield entry.path, locale
+                        else:
+                            stack.append(entry.path)
+            except OSError as e:
+                self.logger.warning(f"Cannot scan directory {current}: {str(e)}")
+    
+    def relative_path(self, path: str, res_dir: str):
+        """path relative to res_dir, which may be an archive whose entries are <archive>!/<entry>."""
+        if path.startswith(f"{res_dir}!"):
+            return path[len(res_dir) + len(ARCHIVE_SEPARATOR):] or "."
+        return os.path.relpath(path, res_dir)
+    
+    def apple_locale(self, folder: str):
+        """Map an Android values folder name to an .lproj locale ("values-pt-rBR" -> "pt-BR"), or None.
+        
+        Folders with any other qualifier (values-de-land, values-v21) are None, like in
+        ResourceArchive.config_folder(): their strings are variants of a locale's, not a locale.
+        """
+        if folder == "values":
+            return "Base"
+        
+        qualifier = folder.split("-", 1)[1]
+        if qualifier.startswith("b+"):
+            if "-" in qualifier:
+                return None
+            subtags = qualifier[2:].split("+")
+        else:
+            parts = qualifier.split("-")
+            if len(parts) > 2 or len(parts) == 2 and not re.fullmatch(r"r([A-Z]{2}|\d{3})", parts[1]):
+                return None
+            subtags = [parts[0]] + [part[1:] for part in parts[1:]]
+        
+        language = subtags[0]
+        if not re.fullmatch(r"[a-z]{2,3}", language) or language in self.NON_LOCALE_QUALIFIERS:
+            return None
+        subtags[0] = self.LEGACY_LANGUAGE_CODES.get(language, language)
+        return "-".join(subtags)
+    
+    def export_jobs(self, res_dir: str, output_dir: str):
+        """Return [(strings.xml, <locale>.lproj/<table>.strings)] for every locale under res_dir."""
+        jobs = []
+        outputs = set()
+        # Sorted so that of two folders of one locale (values-id and values-in) the same one always wins
+        for values_dir, locale in sorted(self.find_locale_dirs(res_dir)):
+            relative = self.relative_path(os.path.dirname(values_dir), res_dir)
+            output_file = os.path.normpath(os.path.join(output_dir, relative, f"{locale}.lproj", f"{self.table}.strings"))
+            if output_file in outputs:
+                self.logger.warning(f"Skipping {values_dir}: locale {locale} is already exported from another folder")
+                continue
+            outputs.add(output_file)
+            jobs.append((os.path.join(values_dir, "strings.xml"), output_file))
+        return jobs
+    
+    def run_export(self, res_dir: str, output_dir: str, export_none_strings: bool = False, sort: bool = True,
+                   stream: bool = False, memory_mb: int | None = None, binary: bool | None = None, key_filter: "KeyFilter | None" = None):
+        jobs = [(xml_file, output_file, export_none_strings, sort, stream, memory_mb, binary, key_filter)
+                for xml_file, output_file in self.export_jobs(res_dir, output_dir)]
+        return self.run(_batch_export_job, jobs, res_dir)
+    
+    def run_catalog(self, res_dir: str, output_dir: str, source_language: str = "en", key_filter: "KeyFilter | None" = None):
+        """Export every res/ folder under res_dir to one <table>.xcstrings holding all of its locales."""
+        modules = {}
+        for values_dir, locale in self.find_locale_dirs(res_dir):
+            modules.setdefault(os.path.dirname(values_dir), []).append((values_dir, locale))
+        if not modules:
+            self.logger.warning(f"No locale folders found under: {res_dir}")
+            print(self.app.ts["batch_no_locales"].format(res_dir))
+            return False
+        
+        start = time.perf_counter()
+        results = []
+        for module_dir, folders in sorted(modules.items()):
+            relative = self.relative_path(module_dir, res_dir)
+            output_file = os.path.normpath(os.path.join(output_dir, relative, f"{self.table}.xcstrings"))
+            result = {"source": module_dir, "output": output_file, "status": "ok"}
+            try:
+                localizations = {}
+                pool = StringPool()
+                # The default values/ folder holds the source language and wins over a values-<source>/
+                for values_dir, locale in sorted(folders, key=lambda folder: folder[1] != "Base"):
+                    locale = source_language if locale == "Base" else locale
+                    if locale in localizations:
+                        self.logger.warning(f"Skipping {values_dir}: locale {locale} is already exported from another folder")
+                        continue
+                    localizations[locale] = self.app.get_xml_strings(os.path.join(values_dir, "strings.xml"), pool=pool, key_filter=key_filter)
+                
+                os.makedirs(os.path.dirname(output_file), exist_ok=True)
+                result["total"] = result["exported"] = self.app.export_string_catalog(output_file, localizations, source_language)
+            except Exception as e:
+                result.update(status="failed", error=str(e))
+            result["metrics"] = self.app.profiler.drain()
+            results.append(result)
+        
+        self.print_summary(results, res_dir, time.perf_counter() - start)
+        return all(result["status"] != "failed" for result in results)
+    
+    def run_import(self, res_dir: str, strings_dir: str, output_dir: str, report_dir: str | None = None, report_format: str | None = None,
+                   key_filter: "KeyFilter | None" = None):
+        if os.path.isfile(res_dir):
+            self.logger.warning(f"Archive rejected as import source: {res_dir}")
+            print(self.app.ts["batch_archive_import"].format(res_dir))
+            return False
+        
+        jobs = []
+        for values_dir, locale in self.find_locale_dirs(res_dir):
+            relative = self.relative_path(os.path.dirname(values_dir), res_dir)
+            apple_file = os.path.normpath(os.path.join(strings_dir, relative, f"{locale}.lproj", f"{self.table}.strings"))
+            output_file = os.path.normpath(os.path.join(output_dir, relative, os.path.basename(values_dir), "strings.xml"))
+            locale_report_dir = os.path.normpath(os.path.join(report_dir, relative, os.path.basename(values_dir))) if report_dir else None
+            jobs.append((os.path.join(values_dir, "strings.xml"), apple_file, output_file, locale_report_dir, report_format, key_filter))
+        return self.run(_batch_import_job, jobs, res_dir)
+    
+    def run_fan_out(self, base_xml: str, strings_dir: str, output_dir: str, report_dir: str | None = None,
+                    report_format: str | None = None, key_filter: "KeyFilter | None" = None):
+        """Import every <locale>.lproj/<table>.strings in strings_dir into base_xml, writing values-<locale>/strings.xml files.
+        
+        The base is read once per worker and shared by all the locales that worker imports,
+        so the cost is one base parse per worker plus one .strings parse and write per locale.
+        """
+        if split_archive_path(base_xml)[0] is not None:
+            self.logger.warning(f"Archive entry rejected as import source: {base_xml}")
+            print(self.app.ts["batch_archive_import"].format(base_xml))
+            return False
+        
+        jobs = []
+        for locale, apple_file in self.find_strings_tables(strings_dir):
+            folder = self.android_values_folder(locale)
+            output_file = os.path.normpath(os.path.join(output_dir, folder, "strings.xml"))
+            locale_report_dir = os.path.normpath(os.path.join(report_dir, folder)) if report_dir else None
+            jobs.append((apple_file, output_file, locale_report_dir, report_format, key_filter))
+        if not jobs:
+            self.logger.warning(f"No {self.table}.strings tables found under: {strings_dir}")
+            print(self.app.ts["batch_no_tables"].format(f"{self.table}.strings", strings_dir))
+            return False
+        return self.run(_batch_fan_out_job, jobs, strings_dir, base_xml)
+    
+    def find_strings_tables(self, strings_dir: str):
+        """Yield (apple_locale, path) for every <locale>.lproj folder in strings_dir holding the table."""
+        with os.scandir(strings_dir) as entries:
+            for entry in sorted(entries, key=lambda entry: entry.name):
+                if entry.is_dir() and entry.name.endswith(".lproj"):
+                    apple_file = os.path.join(entry.path, f"{self.table}.strings")
+                    if os.path.isfile(apple_file):
+                        yield entry.name[:-len(".lproj")], apple_file
+    
+    def android_values_folder(self, locale: str):
+        """Map an .lproj locale to an Android values folder name ("pt-BR" -> "values-pt-rBR"), the reverse of apple_locale()."""
+        if locale == "Base":
+            return "values"
+        
+        subtags = locale.split("-")
+        subtags[0] = self.ANDROID_LANGUAGE_CODES.get(subtags[0], subtags[0])
+        if len(subtags) == 1:
+            return f"values-{subtags[0]}"
+        if len(subtags) == 2 and re.fullmatch(r"[A-Z]{2}|\d{3}", subtags[1]):
+            return f"values-{subtags[0]}-r{subtags[1]}"
+        return f"values-b+{'+'.join(subtags)}"
+    
+    def run(self, worker, jobs: list[tuple], res_dir: str, base_xml: str | None = None):
+        """Run worker over jobs in a process pool; with base_xml every worker also gets that file read once for import."""
+        if not jobs:
+            self.logger.warning(f"No locale folders found under: {res_dir}")
+            print(self.app.ts["batch_no_locales"].format(res_dir))
+            return False
+        
+        workers = min(self.jobs, len(jobs))
+        self.logger.info(f"Batch conversion of {len(jobs)} files with {workers} worker(s)")
+        start = time.perf_counter()
+        
+        base = None
+        if base_xml is not None:
+            # A broken base fails every job the same way, so it is reported once before any of them run
+            try:
+                base = self.app.prepare_import(base_xml)
+            except Exception as e:
+                self.logger.error(f"Error reading base XML {base_xml}: {str(e)}")
+                print(self.app.ts["strings_reading_error"].format(base_xml, str(e)))
+                return False
+            if workers > 1:
+                base.close()  # the workers read their own
+        
+        if workers == 1 and base is None:
+            results = [worker(*job, app=self.app) for job in jobs]
+        elif workers == 1:
+            try:
+                results = [worker(*job, app=self.app, base=base) for job in jobs]
+            finally:
+                base.close()
+        else:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            from logging.handlers import QueueListener
+            log_queue = multiprocessing.Queue()
+            listener = QueueListener(log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+            listener.start()
+            try:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_batch_worker_init,
+                                         initargs=(log_queue, self.profile, base_xml)) as pool:
+                    results = list(pool.map(worker, *zip(*jobs)))
+            finally:
+                listener.stop()
+        
+        elapsed = time.perf_counter() - start
+        self.print_summary(results, res_dir, elapsed)
+        return all(result["status"] != "failed" for result in results)
+    
+    def print_summary(self, results: list[dict], res_dir: str, elapsed: float):
+        ts = self.app.ts
+        lines = []
+        for result in sorted(results, key=lambda r: r["source"]):
+            source = self.relative_path(result["source"], res_dir)
+            if result["status"] == "failed":
+                lines.append(ts["batch_failed_entry"].format(source, result["error"]))
+            elif result["status"] == "missing":
+                lines.append(ts["batch_missing_entry"].format(source, os.path.basename(result["output"])))
+            elif "updated" in result:
+                lines.append(ts["batch_import_entry"].format(source, result["output"], result["updated"]))
+            else:
+                lines.append(ts["batch_export_entry"].format(source, result["output"], result["exported"], result["total"]))
+        
+        converted = sum(1 for result in results if result["status"] == "ok")
+        lines.append("")
+        lines.append(ts["batch_summary"].format(converted, len(results), elapsed))
+        self.logger.info(f"Batch conversion finished: {converted}/{len(results)} files in {elapsed:.2f}s")
+        self.app.print_box(lines)
+        
+        if self.profile:
+            records = [metrics for result in results for metrics in result.get("metrics", [])]
+            self.app.print_box(self.app.format_profile(self.aggregate_profile(records)) + [ts["profile_saved"].format(self.app.profiler.metrics_file)])
+    
+    def aggregate_profile(self, records: list[dict]):
+        """Sum the per-file metrics of each operation into one record per operation."""
+        totals = {}
+        for metrics in records:
+            total = totals.setdefault(metrics["operation"], {"operation": metrics["operation"], "strings": 0, "seconds": 0.0, "phases": {}})
+            total["strings"] += metrics["strings"]
+            total["seconds"] += metrics["seconds"]
+            for name, phase in metrics["phases"].items():
+                phase_total = total["phases"].setdefault(name, {"seconds": 0.0, "peak_memory_bytes": 0})
+                phase_total["seconds"] += phase["seconds"]
+                phase_total["peak_memory_bytes"] = max(phase_total["peak_memory_bytes"], phase["peak_memory_bytes"])
+        
+        for total in totals.values():
+            total["strings_per_second"] = total["strings"] / total["seconds"] if total["seconds"] else 0.0
+            for phase in total["phases"].values():
+                phase["strings_per_second"] = total["strings"] / phase["seconds"] if phase["seconds"] else 0.0
+        return list(totals.values())
+
+class StringsWatcher:
+    """Keep exported .strings files in step with their strings.xml sources while they are edited.
+    
+    Sources are polled with os.stat. Once a change has settled for the debounce delay, only the
+    bytes that differ from the previous version are rescanned, only the keys found there are
+    re-rendered, and the output is rewritten from the cached lines in the same sorted order
+    export_strings() uses. Sources the byte-level scan cannot read (see is_scannable_xml) are
+    parsed in full on every change, but still only their changed keys are re-rendered.
+    """
+    
+    REMOVED = object()
+    # Constructs that, left open before a change, would make text after it read differently
+    UNCLOSED_MARKUP = ((b"<!--", b"-->"), (b"<![CDATA[", b"]]>"), (b"<?", b"?>"))
+    
+    def __init__(self, app: XMLtoSTRINGS, pairs: list[tuple[str, str]], export_none_strings: bool = False,
+                 interval: float = 0.25, debounce: float = 0.2):
+        self.app = app
+        self.logger = app.logger
+        self.pairs = pairs
+        self.export_none_strings = export_none_strings
+        self.interval = interval
+        self.debounce = debounce
+        self.states = {}
+    
+    def run(self):
+        for xml_file, output_file in self.pairs:
+            self.sync(xml_file, output_file)
+        print(self.app.ts["watch_started"].format(len(self.pairs)))
+        
+        pending = {}
+        try:
+            while True:
+                time.sleep(self.interval)
+                now = time.monotonic()
+                for xml_file, output_file in self.pairs:
+                    signature = self.stat(xml_file)
+                    state = self.states.get(xml_file)
+                    if signature is None or (state is not None and signature == state["signature"]):
+                        pending.pop(xml_file, None)
+                        continue
+                    
+                    # Every further write restarts the delay, so a burst of saves syncs once
+                    if xml_file not in pending or pending[xml_file][0] != signature:
+                        pending[xml_file] = (signature, now)
+                    elif now - pending[xml_file][1] >= self.debounce:
+                        del pending[xml_file]
+                        self.sync(xml_file, output_file)
+        except KeyboardInterrupt:
+            self.logger.info("Watch mode stopped by user")
+            print(f"\n{self.app.ts['program_interrupted']}")
+        return True
+    
+    def stat(self, file_path: str):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return stat.st_size, stat.st_mtime_ns
+    
+    def sync(self, xml_file: str, output_file: str):
+        """Bring output_file up to date with xml_file and print what changed."""
+        start = time.perf_counter()
+        state = self.states.get(xml_file)
+        try:
+            signature = self.stat(xml_file)
+            with open(xml_file, "rb") as f:
+                data = f.read()
+            
+            if state is None:
+                state = self.states[xml_file] = {"data": b"", "entries": [], "strings": {}, "counts": {}, "names": [], "lines": []}
+            changes = self.rescan(state, data)
+            added, changed, removed = self.apply_changes(state, changes)
+            state["signature"] = signature
+            
+            if added or changed or removed or not os.path.exists(output_file):
+                self.write_output(state, output_file)
+        except (OSError, SyntaxError, ValueError) as e:
+            self.logger.warning(f"Watch: could not update {output_file} from {xml_file}: {str(e)}")
+            print(self.app.ts["watch_failed_entry"].format(xml_file, str(e)))
+            return False
+        
+        elapsed = (time.perf_counter() - start) * 1000
+        self.logger.info(f"Watch: {xml_file} -> {output_file}: +{added} ~{changed} -{removed} in {elapsed:.1f} ms")
+        print(self.app.ts["watch_entry"].format(xml_file, output_file, added, changed, removed, elapsed))
+        return True
+    
+    def rescan(self, state: dict, data: bytes):
+        """Update the entry index of a source and return {name: text or REMOVED} for the keys it touched."""
+        if not strings_api.is_scannable_xml(data):
+            strings = dict(strings_api.iter_xml_strings(data))
+            changes = {name: text for name, text in strings.items() if state["strings"].get(name, self.REMOVED) != text}
+            changes.update((name, self.REMOVED) for name in state["strings"] if name not in strings)
+            state.update(data=b"", entries=[], counts={})
+            return changes
+        
+        old_data = state["data"]
+        entries = state["entries"]
+        counts = state["counts"]
+        # Coming from a full parse, so keys gone from the file must be found by difference
+        rebuilt = not entries and bool(state["strings"])
+        
+        prefix = self.common_prefix_length(old_data, data)
+        if any(old_data.rfind(opening, 0, prefix) > old_data.rfind(closing, 0, prefix) for opening, closing in self.UNCLOSED_MARKUP):
+            prefix = 0
+        suffix = self.common_suffix_length(old_data, data, min(len(old_data), len(data)) - prefix)
+        shift = len(data) - len(old_data)
+        suffix_start = len(data) - suffix
+        
+        # Restart at the last <string> that starts before the first changed byte: everything
+        # scanned up to there is byte for byte the same as last time
+        starts = [entry[1] for entry in entries]
+        first = bisect.bisect_right(starts, prefix) - 1
+        if first < 0:
+            first = pos = 0
+        else:
+            pos = starts[first]
+        
+        scanned = []
+        resumed = len(entries)
+        while markup := strings_api.XML_MARKUP.search(data, pos):
+            pos = markup.end()
+            kind = markup.lastindex
+            if kind is None:
+                continue
+            
+            if markup.start() >= suffix_start:
+                # From a <string> that also started here last time on, the scan would repeat itself
+                old = bisect.bisect_left(starts, markup.start() - shift)
+                if old < len(entries) and starts[old] == markup.start() - shift:
+                    resumed = old
+                    break
+            
+            name = strings_api.xml_string_name(markup)
+            if kind in (2, 4):
+                scanned.append((name, markup.start(), markup.start(kind), markup.end()))
+            else:
+                scanned.append((name, markup.start(), markup.end(), None))
+        
+        if scanned and scanned[-1][3] == len(data):
+            raise ValueError("unterminated <string> element")
+        
+        tail = entries[resumed:]
+        if shift and tail:
+            tail = [(name, start + shift, text_start + shift, text_end if text_end is None else text_end + shift)
+                    for name, start, text_start, text_end in tail]
+        dropped = entries[first:resumed]
+        state["entries"] = entries[:first] + scanned + tail
+        state["data"] = data
+        
+        for entry in dropped:
+            counts[entry[0]] -= 1
+        for entry in scanned:
+            counts[entry[0]] = counts.get(entry[0], 0) + 1
+        
+        changes = {}
+        last_scanned = {entry[0]: entry for entry in scanned}
+        last_anywhere = None
+        for name in {entry[0] for entry in dropped} | last_scanned.keys():
+            if not name:
+                continue
+            if not counts[name]:
+                del counts[name]
+                changes[name] = self.REMOVED
+                continue
+            
+            entry = last_scanned.get(name)
+            if entry is None or counts[name] > 1:
+                # A key defined more than once keeps its last definition, as in a parsed dict
+                if last_anywhere is None:
+                    last_anywhere = {entry[0]: entry for entry in state["entries"]}
+                entry = last_anywhere[name]
+            changes[name] = strings_api.read_xml_text(data, entry[2], entry[3])
+        
+        if rebuilt:
+            changes.update((name, self.REMOVED) for name in state["strings"] if name not in counts)
+        return changes
+    
+    def apply_changes(self, state: dict, changes: dict):
+        """Apply {name: text or REMOVED} to the cached strings and output lines."""
+        strings = state["strings"]
+        names = state["names"]
+        lines = state["lines"]
+        convert_formats = self.app.config.get("convert_format_specifiers", True)
+        added = changed = removed = 0
+        # Many changes at once (first export, pasted blocks) are cheaper to sort than to insert
+        bulk = len(changes) > 256
+        if bulk:
+            rendered = dict(zip(names, lines))
+        
+        for name, text in changes.items():
+            old_text = strings.get(name, self.REMOVED)
+            if text is old_text or text == old_text:
+                continue
+            
+            if text is self.REMOVED:
+                del strings[name]
+                removed += 1
+            else:
+                strings[name] = text
+                if old_text is self.REMOVED:
+                    added += 1
+                else:
+                    changed += 1
+            
+            line = strings_api.strings_line(name, text, self.export_none_strings) if text is not self.REMOVED else None
+            if line is not None and convert_formats:
+                line = escape_codec.to_apple_format(line)
+            exported = line is not None
+            if bulk:
+                if exported:
+                    rendered[name] = line
+                else:
+                    rendered.pop(name, None)
+                continue
+            
+            index = bisect.bisect_left(names, name)
+            listed = index < len(names) and names[index] == name
+            if exported and listed:
+                lines[index] = line
+            elif exported:
+                names.insert(index, name)
+                lines.insert(index, line)
+            elif listed:
+                del names[index]
+                del lines[index]
+        
+        if bulk:
+            names[:] = sorted(rendered)
+            lines[:] = [rendered[name] for name in names]
+        return added, changed, removed
+    
+    def write_output(self, state: dict, output_file: str):
+        os.makedirs(os.path.dirname(output_file) or ".", exist_ok=True)
+        with self.app.open_output(output_file) as f:
+            f.write(STRINGS_HEADER)
+            f.write("".join(state["lines"]))
+    
+    def common_prefix_length(self, a: bytes, b: bytes, block: int = 1 << 16):
+        limit = min(len(a), len(b))
+        pos = 0
+        while pos < limit and a[pos:pos + block] == b[pos:pos + block]:
+            pos += block
+        if pos >= limit:
+            return limit
+        low, high = pos, min(pos + block, limit)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if a[pos:middle] == b[pos:middle]:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+    
+    def common_suffix_length(self, a: bytes, b: bytes, limit: int, block: int = 1 << 16):
+        a_end, b_end = len(a), len(b)
+        length = 0
+        while length < limit:
+            step = min(block, limit - length)
+            if a[a_end - length - step:a_end - length] != b[b_end - length - step:b_end - length]:
+                break
+            length += step
+        else:
+            return limit
+        low, high = length, min(length + block, limit)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if a[a_end - middle:a_end - length] == b[b_end - middle:b_end - length]:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+class ParsedFileLRU:
+    """Parsed .xml/.strings maps kept in memory, keyed by content hash.
+    
+    The size bound counts source bytes, which is what can be known before parsing; a parsed
+    map takes a few times the size of its source. A file is hashed again only when its size
+    or mtime has changed since it was last seen, and concurrent requests for the same content
+    wait for a single parse.
+    """
+    
+    def __init__(self, hash_file, max_bytes: int):
+        self.hash_file = hash_file
+        self.max_bytes = max_bytes
+        self.entries = collections.OrderedDict()
+        self.signatures = {}
+        self.loading = {}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+    
+    def get(self, kind: str, file_path: str, parse):
+        file_path = os.path.abspath(file_path)
+        stat = os.stat(file_path)
+        with self.lock:
+            known = self.signatures.get(file_path)
+        if known and known[:2] == (stat.st_size, stat.st_mtime_ns):
+            digest = known[2]
+        else:
+            digest = self.hash_file(file_path)
+        
+        key = (kind, digest)
+        while True:
+            with self.lock:
+                self.signatures[file_path] = (stat.st_size, stat.st_mtime_ns, digest)
+                if key in self.entries:
+                    self.entries.move_to_end(key)
+                    self.hits += 1
+                    return self.entries[key][0]
+                loading = self.loading.get(key)
+                if loading is None:
+                    loading = self.loading[key] = threading.Event()
+                    self.misses += 1
+                    break
+            loading.wait()
+        
+        try:
+            result = parse(file_path)
+            after = os.stat(file_path)
+            if (after.st_size, after.st_mtime_ns) != (stat.st_size, stat.st_mtime_ns):
+                return result  # Changed while parsing: the result may not match the hash
+            
+            with self.lock:
+                if stat.st_size <= self.max_bytes:
+                    self.entries[key] = (result, stat.st_size)
+                    self.size += stat.st_size
+                    while self.size > self.max_bytes:
+                        _, (_, size) = self.entries.popitem(last=False)
+                        self.size -= size
+            return result
+        finally:
+            with self.lock:
+                del self.loading[key]
+            loading.set()
+    
+    def stats(self):
+        with self.lock:
+            return {"entries": len(self.entries), "bytes": self.size, "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+class ConversionServer:
+    """Serve export and import requests from one warm process over a local socket.
+    
+    Clients send one JSON object per line and get one JSON reply per line:
+        {"op": "export", "source": ".../values/strings.xml", "output": ".../Base.lproj/Localizable.strings", "export_empty": false}
+        {"op": "import", "source": ".../values-uk/strings.xml", "strings": ".../uk.lproj/Localizable.strings", "output": "..."}
+        {"op": "stats"}
+    Relative paths are resolved against the request's "cwd", if given. Replies carry "status"
+    ("ok" or "failed") and the counts of the conversion or the error. Requests on different
+    connections run concurrently in a thread pool, so they all share one parsed-file LRU.
+    """
+    
+    def __init__(self, app: XMLtoSTRINGS, host: str = "127.0.0.1", port: int = 8765, socket_path: str | None = None,
+                 workers: int | None = None, cache_mb: int = 256):
+        self.app = app
+        self.logger = app.logger
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.workers = workers or os.cpu_count() or 1
+        self.lru = ParsedFileLRU(app.cache.hash_file, cache_mb * 1024 * 1024)
+        # Per-operation profiling state is not shared safely between worker threads
+        app.profiler.enabled = False
+        self.operations = {"export": self.export, "import": self.import_, "stats": self.stats}
+    
+    def run(self):
+        import asyncio
+        from concurrent.futures import ThreadPoolExecutor
+        
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="conversion")
+        try:
+            asyncio.run(self.serve())
+        except KeyboardInterrupt:
+            self.logger.info("Conversion server stopped by user")
+            print(f"\n{self.app.ts['program_interrupted']}")
+        finally:
+            self.pool.shutdown(cancel_futures=True)
+            if self.socket_path and os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        return True
+    
+    async def serve(self):
+        import asyncio
+        
+        if self.socket_path:
+            server = await asyncio.start_unix_server(self.handle, path=self.socket_path)
+            address = self.socket_path
+        else:
+            server = await asyncio.start_server(self.handle, self.host, self.port)
+            address = f"{self.host}:{self.port}"
+        
+        self.logger.info(f"Conversion server listening on {address} with {self.workers} worker(s)")
+        print(self.app.ts["server_started"].format(address, self.workers))
+        async with server:
+            await server.serve_forever()
+    
+    async def handle(self, reader, writer):
+        import asyncio
+        
+        loop = asyncio.get_running_loop()
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                reply = await loop.run_in_executor(self.pool, self.dispatch, line)
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            self.logger.warning(f"Conversion server connection closed: {str(e)}")
+        finally:
+            writer.close()
+    
+    def dispatch(self, line: bytes):
+        start = time.perf_counter()
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict) or request.get("op") not in self.operations:
+                raise ValueError(f"unknown operation, expected one of: {', '.join(self.operations)}")
+            reply = {"status": "ok", **self.operations[request["op"]](request)}
+        except Exception as e:
+            self.logger.error(f"Conversion request failed: {str(e)}")
+            reply = {"status": "failed", "error": str(e)}
+        reply["seconds"] = time.perf_counter() - start
+        return reply
+    
+    def path(self, request: dict, key: str):
+        if not isinstance(request.get(key), str):
+            raise ValueError(f"missing \"{key}\" path")
+        return os.path.join(request.get("cwd") or "", request[key])
+    
+    def export(self, request: dict):
+        source, output = self.path(request, "source"), self.path(request, "output")
+        export_none_strings = bool(request.get("export_empty", False))
+        strings = self.lru.get("xml", source, self.app.get_xml_strings)
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        self.app.export_strings(output, strings, export_none_strings, binary=request.get("binary"))
+        exported = len(strings) if export_none_strings else sum(1 for text in strings.values() if text is not None)
+        return {"total": len(strings), "exported": exported}
+    
+    def import_(self, request: dict):
+        source, apple_file, output = self.path(request, "source"), self.path(request, "strings"), self.path(request, "output")
+        strings = self.lru.get("strings", apple_file, self.app.get_apple_strings)
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+        return {"updated": self.app.import_strings(source, output, strings) if strings else 0}
+    
+    def stats(self, request: dict):
+        return {"cache": self.lru.stats()}
+
+_batch_app = None
+_batch_base = None
+
+def _batch_worker_init(log_queue, profile: bool = False, base_xml: str | None = None):
+    global _batch_app, _batch_base
+    _batch_app = XMLtoSTRINGS(interactive=False, log_queue=log_queue)
+    _batch_app.profiler.enabled = profile
+    if base_xml is not None:
+        # Kept for the life of the worker, shared by every job it runs
+        _batch_base = _batch_app.prepare_import(base_xml)
+
+def _batch_export_job(xml_file: str, output_file: str, export_none_strings: bool, sort: bool = True, stream: bool = False,
+                      memory_mb: int | None = None, binary: bool | None = None, key_filter: KeyFilter | None = None,
+                      app: XMLtoSTRINGS | None = None):
+    app = app or _batch_app
+    result = {"source": xml_file, "output": output_file, "status": "ok"}
+    try:
+        if stream:
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            result["total"], result["exported"] = app.export_xml_stream(xml_file, output_file, export_none_strings, sort, memory_mb, key_filter)
+        else:
+            strings = app.get_xml_strings(xml_file, key_filter=key_filter)
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            app.export_strings(output_file, strings, export_none_strings, sort, binary)
+            result["total"] = len(strings)
+            result["exported"] = len(strings) if export_none_strings else sum(1 for text in strings.values() if text is not None)
+    except Exception as e:
+        result.update(status="failed", error=str(e))
+    result["metrics"] = app.profiler.drain()
+    return result
+
+def _batch_import_job(xml_file: str, apple_file: str, output_file: str, report_dir: str | None = None,
+                      report_format: str | None = None, key_filter: KeyFilter | None = None, app: XMLtoSTRINGS | None = None):
+    app = app or _batch_app
+    result = {"source": xml_file, "output": apple_file, "status": "ok"}
+    if not os.path.isfile(apple_file):
+        result["status"] = "missing"
+        return result
+    try:
+        strings = app.get_apple_strings(apple_file, key_filter=key_filter)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        result["output"] = output_file
+        result["updated"] = app.import_strings(xml_file, output_file, strings, report_dir=report_dir, report_format=report_format) if strings else 0
+    except Exception as e:
+        result.update(status="failed", error=str(e))
+    result["metrics"] = app.profiler.drain()
+    return result
+
+def _batch_fan_out_job(apple_file: str, output_file: str, report_dir: str | None = None, report_format: str | None = None,
+                       key_filter: KeyFilter | None = None, app: XMLtoSTRINGS | None = None, base: strings_api.ImportBase | None = None):
+    app = app or _batch_app
+    if base is None:  # an ImportBase without strings is falsy
+        base = _batch_base
+    result = {"source": apple_file, "output": output_file, "status": "ok"}
+    try:
+        strings = app.get_apple_strings(apple_file, key_filter=key_filter)
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        result["updated"] = app.import_strings(base.file_path, output_file, strings, report_dir=report_dir,
+                                               report_format=report_format, base=base) if strings else 0
+    except Exception as e:
+        result.update(status="failed", error=str(e))
+    result["metrics"] = app.profiler.drain()
+    return result
+
+def parse_args(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description=f"{APP_NAME}. Run without arguments for the interactive menu.")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    export_parser = subparsers.add_parser("export", help="Export every values*/strings.xml under RES_DIR to <locale>.lproj/*.strings")
+    export_parser.add_argument("res_dir", help="Android res/ folder (or any folder containing res/ folders)")
+    export_parser.add_argument("-o", "--output", required=True, help="Folder to write the .lproj folders to")
+    export_parser.add_argument("--export-empty", action="store_true", help="Also export strings without text")
+    export_parser.add_argument("--stream", action="store_true", help="Export while parsing, with memory bounded by --memory-mb instead of the file size")
+    export_parser.add_argument("--memory-mb", type=int, default=None, help="Memory budget of --stream before sorted runs are spilled to disk (default: 64)")
+    export_parser.add_argument("--source-order", action="store_true", help="Keep the order of the source XML instead of sorting by key")
+    export_parser.add_argument("--binary", action="store_true", default=None, help="Write binary property list .strings, as shipped in compiled app bundles")
+    
+    import_parser = subparsers.add_parser("import", help="Import <locale>.lproj/*.strings into every values*/strings.xml under RES_DIR")
+    import_parser.add_argument("res_dir", help="Android res/ folder with the source strings.xml files (not an archive)")
+    import_parser.add_argument("strings_dir", help="Folder containing the .lproj folders")
+    import_parser.add_argument("-o", "--output", required=True, help="Folder to write the updated values*/strings.xml files to")
+    import_parser.add_argument("--report-dir", default=None, help="Write a detailed import report per locale under this folder")
+    import_parser.add_argument("--report-format", choices=ImportReport.FORMATS, default=None, help="Detailed import report format (default: text)")
+    
+    fan_out_parser = subparsers.add_parser("fan-out", help="Import every <locale>.lproj/*.strings in STRINGS_DIR into one base strings.xml, parsed once")
+    fan_out_parser.add_argument("base_xml", help="Base strings.xml the translations are applied to")
+    fan_out_parser.add_argument("strings_dir", help="Folder containing the .lproj folders")
+    fan_out_parser.add_argument("-o", "--output", required=True, help="Folder to write the values-<locale>/strings.xml files to")
+    fan_out_parser.add_argument("--report-dir", default=None, help="Write a detailed import report per locale under this folder")
+    fan_out_parser.add_argument("--report-format", choices=ImportReport.FORMATS, default=None, help="Detailed import report format (default: text)")
+    
+    catalog_parser = subparsers.add_parser("xcstrings", help="Export all values*/strings.xml of each res/ folder under RES_DIR to one String Catalog")
+    catalog_parser.add_argument("res_dir", help="Android res/ folder (or any folder containing res/ folders)")
+    catalog_parser.add_argument("-o", "--output", required=True, help="Folder to write the <table>.xcstrings files to")
+    catalog_parser.add_argument("--source-language", default="en", help="Language of the default values/ folder (default: en)")
+    catalog_parser.add_argument("--profile", action="store_true", help="Record per-phase timing and memory metrics")
+    
+    delta_parser = subparsers.add_parser("delta", help="Export only the strings added or changed between two versions of a strings.xml")
+    delta_parser.add_argument("old_xml", help="strings.xml of the last handoff")
+    delta_parser.add_argument("new_xml", help="Current strings.xml")
+    delta_parser.add_argument("-o", "--output", required=True, help=".strings file to write the delta to")
+    delta_parser.add_argument("--export-empty", action="store_true", help="Also export strings without text")
+    
+    apply_parser = subparsers.add_parser("apply-delta", help="Import a delta .strings into a strings.xml, leaving every other string untouched")
+    apply_parser.add_argument("xml", help="strings.xml to update")
+    apply_parser.add_argument("delta", help="Translated delta .strings file")
+    apply_parser.add_argument("-o", "--output", required=True, help="File to write the updated strings.xml to")
+    apply_parser.add_argument("--report-dir", default=None, help="Write a detailed import report under this folder")
+    apply_parser.add_argument("--report-format", choices=ImportReport.FORMATS, default=None, help="Detailed import report format (default: text)")
+    
+    watch_parser = subparsers.add_parser("watch", help="Export every values*/strings.xml under RES_DIR, then re-export the changed keys on every save")
+    watch_parser.add_argument("res_dir", help="Android res/ folder (or any folder containing res/ folders)")
+    watch_parser.add_argument("-o", "--output", required=True, help="Folder to write the .lproj folders to")
+    watch_parser.add_argument("--export-empty", action="store_true", help="Also export strings without text")
+    watch_parser.add_argument("--interval", type=float, default=0.25, help="Seconds between checks for changes (default: 0.25)")
+    watch_parser.add_argument("--debounce", type=float, default=0.2, help="Seconds a file must stay unchanged before it is re-exported (default: 0.2)")
+    
+    for sub in (export_parser, import_parser, fan_out_parser, catalog_parser, delta_parser, apply_parser):
+        sub.add_argument("--include", action="append", default=[], metavar="PATTERN",
+                         help="Only convert keys matching PATTERN: a prefix, a glob (onboarding_*) or re:<regex>; repeatable")
+        sub.add_argument("--exclude", action="append", default=[], metavar="PATTERN",
+                         help="Skip keys matching PATTERN, same syntax as --include; repeatable")
+    for sub in (export_parser, import_parser, fan_out_parser, catalog_parser, watch_parser):
+        sub.add_argument("--table", default="Localizable", help="Name of the .strings table (default: Localizable)")
+    for sub in (export_parser, import_parser, fan_out_parser):
+        sub.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: number of CPU cores)")
+        sub.add_argument("--profile", action="store_true", help="Record per-phase timing and memory metrics")
+    
+    serve_parser = subparsers.add_parser("serve", help="Keep a warm process serving export/import requests (JSON lines) on a local socket")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="Address to listen on (default: 127.0.0.1)")
+    serve_parser.add_argument("--port", type=int, default=8765, help="TCP port to listen on (default: 8765)")
+    serve_parser.add_argument("--socket", default=None, help="Listen on this Unix socket instead of TCP")
+    serve_parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker threads (default: number of CPU cores)")
+    serve_parser.add_argument("--cache-mb", type=int, default=256, help="Source megabytes of parsed files kept in memory (default: 256)")
+    
+    cache_parser = subparsers.add_parser("clear-cache", help="Invalidate cached XML parse results")
+    cache_parser.add_argument("paths", nargs="*", help="Source XML files to invalidate (default: the whole cache)")
+    
+    args = parser.parse_args(argv)
+    if args.command == "export" and args.stream and args.binary:
+        parser.error("--binary cannot be combined with --stream")
+    if getattr(args, "include", None) or getattr(args, "exclude", None):
+        try:
+            args.key_filter = KeyFilter(args.include, args.exclude)
+        except re.error as e:
+            parser.error(f"invalid key pattern: {e}")
+    else:
+        args.key_filter = None
+    return args
+
+def run_command(args):
+    app = XMLtoSTRINGS(interactive=False)
+    if args.command == "clear-cache":
+        print(app.ts["cache_cleared"].format(app.cache.invalidate(args.paths)))
+        return True
+    
+    if args.command == "serve":
+        return ConversionServer(app, args.host, args.port, args.socket, args.jobs, args.cache_mb).run()
+    
+    if args.command == "xcstrings":
+        return BatchConverter(app, 1, args.table, args.profile).run_catalog(args.res_dir, args.output, args.source_language, args.key_filter)
+    
+    if args.command == "delta":
+        try:
+            counts = app.export_delta(args.old_xml, args.new_xml, args.output, args.export_empty, args.key_filter)
+        except Exception as e:
+            app.logger.error(f"Delta export error: {str(e)}")
+            print(app.ts["export_error"].format(str(e)))
+            return False
+        print(app.ts["delta_entry"].format(args.new_xml, args.output, *counts))
+        return True
+    
+    if args.command == "apply-delta":
+        try:
+            updated = app.import_strings(args.xml, args.output, app.get_apple_strings(args.delta, key_filter=args.key_filter), report_dir=args.report_dir, report_format=args.report_format)
+        except Exception as e:
+            app.logger.error(f"Delta import error: {str(e)}")
+            print(app.ts["import_error"].format(str(e)))
+            return False
+        print(app.ts["batch_import_entry"].format(args.delta, args.output, updated))
+        return True
+    
+    if args.command == "watch":
+        batch = BatchConverter(app, 1, args.table)
+        pairs = batch.export_jobs(args.res_dir, args.output)
+        if not pairs:
+            print(app.ts["batch_no_locales"].format(args.res_dir))
+            return False
+        return StringsWatcher(app, pairs, args.export_empty, args.interval, args.debounce).run()
+    
+    batch = BatchConverter(app, args.jobs, args.table, args.profile)
+    if args.command == "fan-out":
+        return batch.run_fan_out(args.base_xml, args.strings_dir, args.output, args.report_dir, args.report_format, args.key_filter)
+    if args.command == "export":
+        return batch.run_export(args.res_dir, args.output, args.export_empty, not args.source_order, args.stream, args.memory_mb, args.binary, args.key_filter)
+    return batch.run_import(args.res_dir, args.strings_dir, args.output, args.report_dir, args.report_format, args.key_filter)
+
 if __name__ == "__main__":
+    args = parse_args()
+    if args.command:
+        sys.exit(0 if run_command(args) else 1)
+    
     try:
         app = XMLtoSTRINGS()
     except Exception as e:
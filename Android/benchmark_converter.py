@@ -0,0 +1,230 @@
+import io
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import datetime
+import platform
+import statistics
+import subprocess
+import tracemalloc
+
+import escape_codec
+import strings_api
+from XML_to_STRINGS_Converter import XMLtoSTRINGS, StringPool
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+# Translations held at once by the multi-locale benchmarks
+LOCALES = 3
+
+# Text fragments covering what real resource files contain: plain words, Android escapes,
+# placeholders, markup entities and non-ASCII scripts
+WORDS = ["Save", "Cancel", "settings", "file", "download", "your", "account", "%1$s", "%d", "\\'", "\\\"",
+         "\\n", "&amp;", "&lt;b&gt;", "Привіт", "Größe", "日本語", "مرحبا", "emoji 🎉", "naïve"]
+
+def generate_texts(count: int, seed: int = 0):
+    """Deterministic (name, text) pairs; text is None for empty strings."""
+    rng = random.Random(seed)
+    for i in range(count):
+        kind = rng.random()
+        if kind < 0.05:
+            text = None
+        elif kind < 0.10:
+            text = f"\"  {' '.join(rng.choices(WORDS, k=3))}  \""
+        elif kind < 0.15:
+            text = "Line one\tand\nline two\r\n"
+        else:
+            text = " ".join(rng.choices(WORDS, k=rng.randint(1, 12)))
+        yield f"key_{i:07d}_{rng.choice(WORDS[:7]).lower()}", text
+
+def generate_xml(file_path: str, count: int, seed: int = 0, locale: int = 0):
+    """Write a synthetic Android strings.xml with comments, empty strings and escaped text.
+    
+    A locale other than 0 gets the same keys with about two thirds of the texts translated.
+    """
+    rng = random.Random(f"{seed}-{locale}")
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<resources>\n')
+        for i, (name, text) in enumerate(generate_texts(count, seed)):
+            if locale and text is not None and rng.random() < 0.67:
+                text = " ".join(rng.choices(WORDS, k=rng.randint(1, 12)))
+            if i % 100 == 0:
+                f.write(f"    <!-- Section {i // 100} -->\n")
+            if text is None:
+                f.write(f'    <string name="{name}"/>\n')
+            else:
+                f.write(f'    <string name="{name}">{text}</string>\n')
+        f.write("</resources>\n")
+
+def generate_strings(file_path: str, count: int, seed: int = 0):
+    """Write a synthetic .strings file with the keys of generate_xml(), a third of them edited."""
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write("/* Synthetic benchmark table */\n")
+        for i, (name, text) in enumerate(generate_texts(count, seed)):
+            if i % 100 == 0:
+                f.write(f"// Section {i // 100}\n")
+            if i % 250 == 0:
+                f.write("/* Multi-line\n   comment */\n")
+            if text is not None and i % 3 == 0:
+                text += " (edited)"
+            value = escape_codec.quote(text or "")
+            f.write(f"\"{name}\" = \"{value}\";\n")
+
+def measure(func, repeat: int):
+    """Run func() repeat times and return (result of the last run, seconds per run, peak traced MB, retained traced MB)."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    
+    result = None
+    tracemalloc.start()
+    result = func()
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, timings, peak / (1024 * 1024), retained / (1024 * 1024)
+
+def without_logging(func):
+    """Run func() with logging disabled: the baseline for the logging cost at the configured level."""
+    logging.disable(logging.CRITICAL)
+    try:
+        return func()
+    finally:
+        logging.disable(logging.NOTSET)
+
+def load_locales(app: XMLtoSTRINGS, files: list[str], pool: StringPool):
+    return [app.get_xml_strings(file, pool=pool) for file in files]
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(sizes: list[str], repeat: int, work_dir: str, seed: int = 0):
+    app = XMLtoSTRINGS(interactive=False)
+    # Every run must parse: a cache hit would only measure the cache
+    app.cache.enabled = False
+    app.profiler.enabled = False
+    
+    revision = git_revision()
+    run_info = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform()
+    }
+    
+    os.makedirs(work_dir, exist_ok=True)
+    for size in sizes:
+        count = SIZES[size]
+        xml_file = os.path.join(work_dir, f"strings_{size}.xml")
+        apple_file = os.path.join(work_dir, f"Localizable_{size}.strings")
+        export_file = os.path.join(work_dir, f"export_{size}.strings")
+        import_file = os.path.join(work_dir, f"import_{size}.xml")
+        if not os.path.isfile(xml_file):
+            generate_xml(xml_file, count, seed)
+        if not os.path.isfile(apple_file):
+            generate_strings(apple_file, count, seed + 1)
+        locale_files = [xml_file]
+        for locale in range(1, LOCALES):
+            locale_files.append(os.path.join(work_dir, f"strings_{size}_locale{locale}.xml"))
+            if not os.path.isfile(locale_files[-1]):
+                generate_xml(locale_files[-1], count, seed, locale)
+        
+        strings = app.get_xml_strings(xml_file)
+        apple_strings = app.get_apple_strings(apple_file)
+        texts = [text for text in strings.values() if text is not None]
+        quoted = escape_codec.quote_batch(texts)
+        
+        cases = [
+            ("get_xml_strings", lambda: app.get_xml_strings(xml_file, streaming=True), count),
+            ("get_xml_strings[tree]", lambda: app.get_xml_strings(xml_file, streaming=False), count),
+            ("export_strings", lambda: app.export_strings(export_file, strings, True), count),
+            ("get_apple_strings", lambda: app.get_apple_strings(apple_file), count),
+            ("import_strings", lambda: app.import_strings(xml_file, import_file, apple_strings, patch=True), count),
+            ("import_strings[tree]", lambda: app.import_strings(xml_file, import_file, apple_strings, patch=False), count),
+            # The same operations without any logging: the gap to the cases above is the logging overhead
+            ("get_xml_strings[no log]", lambda: without_logging(lambda: app.get_xml_strings(xml_file, streaming=True)), count),
+            ("export_strings[no log]", lambda: without_logging(lambda: app.export_strings(export_file, strings, True)), count),
+            ("get_apple_strings[no log]", lambda: without_logging(lambda: app.get_apple_strings(apple_file)), count),
+            ("import_strings[no log]", lambda: without_logging(lambda: app.import_strings(xml_file, import_file, apple_strings, patch=True)), count),
+            # The library API on its own: no converter, config, cache or profiler around the conversion
+            ("strings_api[export]", lambda: strings_api.write_strings(io.BytesIO(), strings_api.iter_xml_strings(xml_file)), count),
+            ("strings_api[import]", lambda: sum(1 for _ in strings_api.apply_strings(xml_file, apple_strings, io.BytesIO())), count),
+            ("quote", lambda: escape_codec.quote_batch(texts), len(texts)),
+            ("unquote", lambda: escape_codec.unquote_batch(quoted), len(quoted)),
+            # Every locale held at once: plain dicts against StringTables sharing one StringPool
+            ("locales[dict]", lambda: [app.get_xml_strings(file) for file in locale_files], count * LOCALES),
+            ("locales[table]", lambda: load_locales(app, locale_files, StringPool()), count * LOCALES)
+        ]
+        for name, func, items in cases:
+            _, timings, peak, retained = measure(func, repeat)
+            best = min(timings)
+            yield {
+                **run_info,
+                "benchmark": name,
+                "size": size,
+                "items": items,
+                "repeat": repeat,
+                "best_seconds": best,
+                "median_seconds": statistics.median(timings),
+                "items_per_second": items / best if best else 0.0,
+                "peak_memory_mb": peak,
+                "retained_memory_mb": retained
+            }
+
+def load_baseline(file_path: str):
+    """Latest result per (benchmark, size) from an earlier results file."""
+    baseline = {}
+    with open(file_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                baseline[(record["benchmark"], record["size"])] = record
+    return baseline
+
+def format_result(record: dict, baseline: dict):
+    line = (f"{record['benchmark']:<26} {record['size']:>5} {record['best_seconds']:>9.4f}s {record['median_seconds']:>9.4f}s "
+            f"{record['items_per_second']:>14,.0f}/s {record['peak_memory_mb']:>9.1f} MB {record.get('retained_memory_mb', 0.0):>9.1f} MB")
+    previous = baseline.get((record["benchmark"], record["size"]))
+    if previous and record["best_seconds"]:
+        line += f"  x{previous['best_seconds'] / record['best_seconds']:.2f} vs {previous.get('revision') or 'baseline'}"
+    return line
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the XML <-> STRINGS converter on synthetic files.")
+    parser.add_argument("--sizes", default="1k,100k", help=f"Comma-separated sizes out of {', '.join(SIZES)} (default: 1k,100k)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark; the best and median are reported (default: 3)")
+    parser.add_argument("--work-dir", default="benchmark_data", help="Folder for the generated files, reused between runs (default: benchmark_data)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic data (default: 0)")
+    parser.add_argument("-o", "--output", default="benchmark_results.jsonl", help="JSON Lines file the results are appended to")
+    parser.add_argument("--compare", default=None, help="Earlier results file to print speedups against")
+    args = parser.parse_args(argv)
+    
+    args.sizes = [size.strip() for size in args.sizes.split(",") if size.strip()]
+    unknown = [size for size in args.sizes if size not in SIZES]
+    if unknown:
+        parser.error(f"unknown size(s): {', '.join(unknown)}")
+    return args
+
+def main(argv=None):
+    args = parse_args(argv)
+    baseline = load_baseline(args.compare) if args.compare else {}
+    
+    print(f"{'benchmark':<26} {'size':>5} {'best':>10} {'median':>10} {'throughput':>16} {'peak':>12} {'retained':>12}")
+    with open(args.output, "a", encoding="utf-8") as f:
+        for record in run_benchmarks(args.sizes, args.repeat, args.work_dir, args.seed):
+            print(format_result(record, baseline))
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+    print(f"Results appended to {args.output}")
+
+if __name__ == "__main__":
+    sys.exit(main())
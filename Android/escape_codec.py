@@ -0,0 +1,169 @@
+import re
+
+# Control characters written as backslash escapes in .strings files. Quotes and backslashes
+# are passed through untouched because Android resources already escape them the same way.
+ESCAPES = {
+    "\a": "\\a",
+    "\b": "\\b",
+    "\f": "\\f",
+    "\n": "\\n",
+    "\r": "\\r",
+    "\t": "\\t",
+    "\v": "\\v",
+    "\0": "\\0",
+}
+UNESCAPES = {escaped: char for char, escaped in ESCAPES.items()}
+
+_ESCAPE_ITEMS = tuple(ESCAPES.items())
+_UNESCAPE_ITEMS = tuple(UNESCAPES.items())
+
+# Backslash escapes of Android resources (and .strings), resolved to the characters they stand for
+_RESOLVED = {escaped[1]: char for char, escaped in ESCAPES.items()}
+_RESOLVABLE = re.compile(r"\\(u[0-9A-Fa-f]{4}|.)", re.S)
+
+def _resolve_escape(match):
+    escaped = match.group(1)
+    if len(escaped) == 5:
+        return chr(int(escaped[1:], 16))
+    return _RESOLVED.get(escaped, escaped)
+
+# printf-style placeholders of both platforms: %s, %1$d, %.2f, %% on Android and %@, %ld, %llu on
+# Apple. The space flag is left out so that prose such as "50% off" is not taken for a placeholder.
+FORMAT_SPECIFIER = re.compile(r"%(?:(\d+)\$)?[-#+0,(]*\d*(?:\.\d+)?(?:hh|h|ll|l|q|z|t|j)?([a-zA-Z@%])")
+_ANDROID_OBJECT = re.compile(r"%(?:(%)|((?:\d+\$)?[-#+0,(]*\d*(?:\.\d+)?)[sS])")
+_APPLE_SPECIFIER = re.compile(r"%(?:(%)|((?:\d+\$)?[-#+0,(]*\d*(?:\.\d+)?)(?:(?:hh|h|ll|l|q|z|t|j)(?=[diouxXcCsSfFeEgGaAp@]))?([@uU])?)")
+# Conversions that take the same kind of argument, for comparing placeholders across platforms
+_PLACEHOLDER_KINDS = {"@": "s", "S": "s", "i": "d", "u": "d", "U": "d", "D": "d", "X": "x", "E": "e", "G": "g", "A": "a", "B": "b", "H": "h"}
+_BATCH_SEPARATOR = "\0"
+
+def _apple_object(match):
+    return "%%" if match.group(1) else f"%{match.group(2)}@"
+
+def _android_specifier(match):
+    if match.group(1):
+        return "%%"
+    spec = match.group(2)
+    conversion = match.group(3)
+    if conversion is None:
+        return f"%{spec}"  # Length modifier dropped, the conversion follows unchanged
+    return f"%{spec}s" if conversion == "@" else f"%{spec}d"
+
+def quote(s: str):
+    """Escape the control characters of an XML text for a .strings value."""
+    if not s:
+        return s
+
+    if s[0] == '"' and s[-1] == '"':
+        s = s[1:-1]
+
+    # One C-level scan settles the common case: none of the escaped characters is printable
+    if s.isprintable():
+        return s
+
+    for char, escaped in _ESCAPE_ITEMS:
+        if char in s:
+            s = s.replace(char, escaped)
+    return s
+
+def unquote(s: str):
+    """Turn a .strings value back into Android resource text."""
+    if not s:
+        return s
+
+    if "\\" in s:
+        for escaped, char in _UNESCAPE_ITEMS:
+            if escaped in s:
+                s = s.replace(escaped, char)
+    return _android_text(s)
+
+def _android_text(s: str):
+    # Quote what Android would otherwise collapse or strip
+    if "  " in s or "'" in s or "\n" in s or "\r" in s or "\t" in s or s[0] == " " or s[-1] == " ":
+        return f'"{s}"'
+    if s[0] == "?":
+        return f"\\{s}"
+    return s
+
+def resolve(s: str):
+    """Plain text of an XML text: surrounding quotes dropped and \\n, \\', \\u0041 etc. resolved."""
+    if not s:
+        return s
+
+    if s[0] == '"' and s[-1] == '"' and len(s) > 1:
+        s = s[1:-1]
+    if "\\" not in s:
+        return s
+    return _RESOLVABLE.sub(_resolve_escape, s)
+
+def unresolve(s: str):
+    """Android resource text of a plain text (e.g. a binary plist value), the reverse of resolve()."""
+    if not s:
+        return s
+
+    if "\\" in s or '"' in s:
+        s = s.replace("\\", "\\\\").replace('"', '\\"')
+    return _android_text(s)
+
+def to_apple_format(s: str):
+    """Rewrite the Android object placeholders of a text for Apple: %s -> %@, %1$s -> %1$@."""
+    if not s or "%" not in s:
+        return s
+    return _ANDROID_OBJECT.sub(_apple_object, s)
+
+def to_android_format(s: str):
+    """Rewrite Apple placeholders for Android: %@ -> %s, %1$@ -> %1$s, %ld -> %d, %lu -> %d."""
+    if not s or "%" not in s:
+        return s
+    return _APPLE_SPECIFIER.sub(_android_specifier, s)
+
+def placeholders(s: str):
+    """Sorted (argument position, kind) pairs of a text's placeholders, alike for both platforms."""
+    if not s or "%" not in s:
+        return []
+
+    found = []
+    position = 0
+    for match in FORMAT_SPECIFIER.finditer(s):
+        conversion = match.group(2)
+        if conversion == "%" or conversion == "n":
+            continue
+        if match.group(1):
+            index = int(match.group(1))
+        else:
+            position += 1
+            index = position
+        found.append((index, _PLACEHOLDER_KINDS.get(conversion, conversion)))
+    found.sort()
+    return found
+
+def placeholders_match(source: str, translation: str):
+    """Whether a translation takes the same arguments as its source, in any order."""
+    if (not source or "%" not in source) and (not translation or "%" not in translation):
+        return True
+    return placeholders(source) == placeholders(translation)
+
+def quote_batch(values: list[str]):
+    """quote() over a whole list of values."""
+    return [quote(value) for value in values]
+
+def unquote_batch(values: list[str]):
+    """unquote() over a whole list of values."""
+    return [unquote(value) for value in values]
+
+def _convert_batch(values: list[str], pattern, replace):
+    # One regex pass over the joined batch; a value holding the separator falls back to per value
+    joined = _BATCH_SEPARATOR.join(values)
+    if "%" not in joined:
+        return values
+    converted = pattern.sub(replace, joined).split(_BATCH_SEPARATOR)
+    if len(converted) != len(values):
+        return [pattern.sub(replace, value) for value in values]
+    return converted
+
+def to_apple_format_batch(values: list[str]):
+    """to_apple_format() over a whole list of values (no None entries)."""
+    return _convert_batch(values, _ANDROID_OBJECT, _apple_object)
+
+def to_android_format_batch(values: list[str]):
+    """to_android_format() over a whole list of values (no None entries)."""
+    return _convert_batch(values, _APPLE_SPECIFIER, _android_specifier)
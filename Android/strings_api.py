@@ -0,0 +1,723 @@
+"""Streaming Android strings.xml <-> Apple .strings conversion, usable without the interactive converter.
+
+Nothing here reads a config file, sets up logging, prompts or caches, so any number of
+conversions can run in one process. Sources are paths, binary file objects or bytes-like
+buffers, and every option is an explicit argument:
+
+    iter_xml_strings(source)                          (name, text) of each <string>
+    iter_apple_strings(source)                        (name, Android text) of a text or binary .strings
+    write_strings(destination, strings)               write a .strings, return the counts
+    apply_strings(source, strings, destination)       (status, name, old, new) per key, then the updated XML
+
+The lower-level helpers they are built from are public too, for callers such as the converter
+that time or log the steps one by one.
+"""
+import re
+import io
+import os
+import html
+import mmap
+import codecs
+import struct
+import logging
+import itertools
+import contextlib
+import collections.abc
+from xml.parsers import expat
+
+import escape_codec
+
+logger = logging.getLogger(__name__)
+
+# The XML library is imported on first use, so a conversion that never parses XML does not pay for it
+_etree = None
+
+def load_etree():
+    """Return lxml.etree when installed, otherwise the standard library's ElementTree."""
+    global _etree
+    if _etree is None:
+        try:
+            from lxml import etree # type: ignore
+        except ImportError:
+            import xml.etree.ElementTree as etree
+        _etree = etree
+    return _etree
+
+APP_NAME = "Android XML to iOS STRINGS Converter"
+STRINGS_HEADER = f"/* Generated by veydzh3r's {APP_NAME}: https://github.com/Veydzher/Translation-Tools/tree/main/Android */\n"
+EXPORT_BATCH_SIZE = 10000
+
+# .strings syntax: one full `"key" = "value";` entry (after any whitespace/comments) for the fast path,
+# and single tokens for everything else. Both are written in unrolled form so a failed match never backtracks.
+_STRINGS_TRIVIA = r'\s*(?:(?:/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//[^\n]*\n)\s*)*'
+_STRINGS_QUOTED = r'"([^"\\]*(?:\\.[^"\\]*)*)"'
+STRINGS_ENTRY = re.compile(_STRINGS_TRIVIA + _STRINGS_QUOTED + r'\s*=\s*' + _STRINGS_QUOTED + r'\s*;', re.S)
+# Fallback for one-line entries whose key or value holds quotes that cannot end it
+_STRINGS_LENIENT = r'"([^"\\\n]*(?:(?:\\.|"(?![ \t]*{}))[^"\\\n]*)*)"'
+STRINGS_LENIENT_ENTRY = re.compile(_STRINGS_TRIVIA + _STRINGS_LENIENT.format("=") + r'[ \t]*=[ \t]*' + _STRINGS_LENIENT.format(";") + r'[ \t]*;', re.S)
+STRINGS_TOKEN = re.compile(r'\s+|/\*[^*]*\*+(?:[^/*][^*]*\*+)*/|//[^\n]*|' + _STRINGS_QUOTED + r'|([=;])|([^\s"=;/]+)|(.)', re.S)
+
+# Byte-level markup scan used to patch strings.xml in place. Comments, CDATA and processing
+# instructions are matched only so that a "<string" inside them is skipped. A <string> match
+# ends where lxml's element text ends; the empty group marks where that text starts.
+_XML_ATTRIBUTES = rb'(?:\s+[^\s=/>]+\s*=\s*(?:"[^"]*"|\'[^\']*\'))*'
+_XML_TEXT = rb'\s*(?:/>|>()[^<]*(?:<!\[CDATA\[.*?\]\]>[^<]*)*)'
+XML_DECLARATION = re.compile(rb'<\?xml[^>]*?encoding\s*=\s*["\']([A-Za-z0-9._-]+)["\']|<\?xml')
+XML_MARKUP = re.compile(
+    rb'<!--.*?-->|<!\[CDATA\[.*?\]\]>|<\?.*?\?>'
+    rb'|<string\s+name="([^"&]*)"' + _XML_ATTRIBUTES + _XML_TEXT +  # common case: plain name first
+    rb'|<string(' + _XML_ATTRIBUTES + rb')' + _XML_TEXT,
+    re.S
+)
+XML_NAME_ATTRIBUTE = re.compile(rb'(?:^|\s)name\s*=\s*(?:"([^"]*)"|\'([^\']*)\')')
+XML_INVALID_CHARS = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]")
+
+# Binary property list .strings: header, trailer (offset size, reference size, object count,
+# top object, offset table position) and the big-endian integer codes for each width
+BINARY_PLIST_MAGIC = b"bplist00"
+BPLIST_TRAILER = struct.Struct(">6xBBQQQ")
+BPLIST_INT = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+_BUFFER_TYPES = (bytes, bytearray, memoryview)
+
+def is_path(source):
+    return isinstance(source, (str, os.PathLike))
+
+@contextlib.contextmanager
+def open_source(source):
+    """Binary file object over a path, a bytes-like buffer or an open binary file (left open)."""
+    if isinstance(source, _BUFFER_TYPES):
+        yield io.BytesIO(source)
+    elif is_path(source):
+        with open(source, "rb") as f:
+            yield f
+    else:
+        yield source
+
+@contextlib.contextmanager
+def open_destination(destination):
+    """Binary file object for a path, or an open file (left open) as it is."""
+    if is_path(destination):
+        with open(destination, "wb") as f:
+            yield f
+    else:
+        yield destination
+
+def text_writer(f):
+    """write() of f for str chunks, encoding them as UTF-8 when f is a binary file."""
+    if isinstance(f, io.TextIOBase):
+        return f.write
+    return lambda text: f.write(text.encode("utf-8"))
+
+# strings.xml
+
+def iter_xml_strings(source, key_filter=None):
+    """Yield (name, text) for each <string> element without building the whole tree.
+
+    Elements without a name, or whose name key_filter rejects, are dropped without their
+    text being read.
+    """
+    if isinstance(source, _BUFFER_TYPES):
+        source = io.BytesIO(source)
+    elif isinstance(source, os.PathLike):
+        source = os.fspath(source)
+
+    ET = load_etree()
+    if ET.__name__ != "lxml.etree":
+        return _iter_xml_strings_stdlib(ET, source, key_filter)
+    return _iter_xml_strings_lxml(ET, source, key_filter)
+
+def _iter_xml_strings_lxml(ET, source, key_filter):
+    for _, elem in ET.iterparse(source, events=("end",), tag="string"):
+        name = elem.get("name")
+        if name and (key_filter is None or key_filter(name)):
+            yield name, elem.text
+
+        # Drop the handled element and everything parsed before it so memory stays flat
+        elem.clear(keep_tail=False)
+        parent = elem.getparent()
+        if parent is not None:
+            while elem.getprevious() is not None:
+                del parent[0]
+
+def _iter_xml_strings_stdlib(ET, source, key_filter):
+    # ElementTree has neither a tag filter nor parent links: track the depth instead and
+    # empty the root after every top-level element
+    root = None
+    depth = 0
+    for event, elem in ET.iterparse(source, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+
+        depth -= 1
+        if elem.tag == "string":
+            name = elem.get("name")
+            if name and (key_filter is None or key_filter(name)):
+                yield name, elem.text
+        if depth == 1:
+            del root[:]
+
+def parse_xml_tree(source):
+    """Whole element tree of a strings.xml, comments and namespace prefixes included."""
+    if isinstance(source, _BUFFER_TYPES):
+        source = io.BytesIO(source)
+    ET = load_etree()
+    if ET.__name__ == "lxml.etree":
+        return ET.parse(source, parser=None)
+
+    # Keep comments and processing instructions, and the source's namespace prefixes
+    # (xliff:, tools:) instead of ns0:, so a rewritten file stays close to the original
+    class TreeBuilder(ET.TreeBuilder):
+        def start_ns(self, prefix, uri):
+            if prefix:
+                ET.register_namespace(prefix, uri)
+
+    parser = ET.XMLParser(target=TreeBuilder(insert_comments=True, insert_pis=True))
+    return ET.parse(source, parser=parser)
+
+def write_xml_tree(tree, f):
+    """Serialize a tree from parse_xml_tree() into a binary file object."""
+    if load_etree().__name__ == "lxml.etree":
+        tree.write(f, encoding="utf-8", xml_declaration=True, pretty_print=True)
+    else:
+        tree.write(f, encoding="utf-8", xml_declaration=True)
+
+def map_xml_source(file_path):
+    """Memory-map a UTF-8 source XML for patching, or return None when only a full rewrite is safe."""
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return None
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if not is_scannable_xml(data):
+        data.close()
+        return None
+    return data
+
+def is_scannable_xml(data):
+    head = data[:4]
+    declaration = XML_DECLARATION.match(data, 3 if head.startswith(codecs.BOM_UTF8) else 0)
+    encoding = declaration.group(1).decode("ascii").lower() if declaration and declaration.group(1) else "utf-8"
+    # UTF-16/32 files have a BOM or NUL bytes up front and no ASCII declaration to go by
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)) or b"\0" in head:
+        encoding = "utf-16"
+    # Other encodings and DTD entities need the real parser to read the texts
+    return encoding in ("utf-8", "utf8") and data.find(b"<!DOCTYPE") == -1
+
+def index_xml_strings(data):
+    """Return [(name, text_start, text_end)] for every <string> in document order, in one scan.
+
+    text_end is None for self-closing elements. The text range runs up to the first child
+    element or the end tag, which is exactly what lxml exposes as the element's text. Returns
+    None for a document that is not well-formed, so the tree parser reports the error.
+    """
+    if not is_well_formed_xml(data):
+        return None
+
+    index = []
+    append = index.append
+    for markup in XML_MARKUP.finditer(data):
+        kind = markup.lastindex
+        if kind is None:  # comment, CDATA or processing instruction
+            continue
+
+        name = xml_string_name(markup)
+        if kind in (2, 4):
+            append((name, markup.start(kind), markup.end()))
+        else:
+            append((name, markup.end(), None))
+
+    return index
+
+def xml_string_name(markup):
+    """name attribute of a <string> matched by XML_MARKUP, None without one."""
+    if markup.lastindex <= 2:
+        return markup.group(1).decode("utf-8")
+    name = XML_NAME_ATTRIBUTE.search(markup.group(3))
+    return html.unescape((name.group(1) or name.group(2)).decode("utf-8")) if name else None
+
+def is_well_formed_xml(data, chunk_size=1 << 20):
+    # expat without handlers checks the syntax only, at a fraction of the cost of building a tree
+    parser = expat.ParserCreate()
+    with memoryview(data) as view:
+        try:
+            for pos in range(0, len(view), chunk_size):
+                parser.Parse(view[pos:pos + chunk_size], False)
+            parser.Parse(b"", True)
+        except expat.ExpatError:
+            return False
+    return True
+
+def read_xml_text(data, start, end):
+    if end is None:
+        return None
+    raw = data[start:end].decode("utf-8")
+    if not raw:
+        return None
+    if "&" not in raw and "<" not in raw and "\r" not in raw:
+        return raw
+
+    # Same line-ending normalization an XML parser applies before entities are expanded
+    parts = re.split(r"<!\[CDATA\[(.*?)\]\]>", raw.replace("\r\n", "\n").replace("\r", "\n"), flags=re.S)
+    return "".join(html.unescape(part) if i % 2 == 0 else part for i, part in enumerate(parts)) or None
+
+def escape_xml_text(text):
+    if XML_INVALID_CHARS.search(text):
+        raise ValueError("All strings must be XML compatible: Unicode or ASCII, no NULL bytes or control characters")
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\r", "&#13;").encode("utf-8")
+
+def write_patched_xml(data, updates, f):
+    """Copy the source bytes through to f, replacing only the text ranges of updated strings."""
+    # Released even on error, otherwise the caller cannot close the mapping
+    with memoryview(data) as view:
+        pos = 0
+        for (start, end), new_text in updates:
+            f.write(view[pos:start])
+            f.write(escape_xml_text(new_text))
+            pos = end
+        f.write(view[pos:])
+
+# .strings
+
+def read_apple_strings(f, chunk_size=1 << 20):
+    """Return (raw (key, value) pairs, binary) of an open binary .strings file, text or property list.
+
+    The pairs are read lazily and still escaped; convert_apple_batch() turns them into Android text.
+    """
+    head = f.read(len(BINARY_PLIST_MAGIC))
+    if head == BINARY_PLIST_MAGIC:
+        return iter_binary_strings(head + f.read()), True
+    return iter_raw_apple_strings(f, chunk_size, head), False
+
+def convert_apple_batch(batch, binary=False, key_filter=None, convert_formats=True):
+    """Return the keys and Android texts of a list of pairs from read_apple_strings().
+
+    The values of keys rejected by key_filter are neither unescaped nor converted.
+    """
+    if binary:
+        unescape = escape_codec.unresolve
+    else:
+        unescape = escape_codec.unquote
+        batch = [(unescape(key), value) for key, value in batch]
+    if key_filter is not None:
+        batch = [(key, value) for key, value in batch if key_filter(key)]
+    values = [unescape(value) for _, value in batch]
+    if convert_formats:
+        values = escape_codec.to_android_format_batch(values)
+    return [key for key, _ in batch], values
+
+def iter_apple_strings(source, key_filter=None, convert_formats=True, chunk_size=1 << 20):
+    """Yield (name, Android text) from a .strings file, text or binary property list, in batches."""
+    with open_source(source) as f:
+        pairs, binary = read_apple_strings(f, chunk_size)
+        while batch := list(itertools.islice(pairs, EXPORT_BATCH_SIZE)):
+            yield from zip(*convert_apple_batch(batch, binary, key_filter, convert_formats))
+
+def iter_raw_apple_strings(f, chunk_size=1 << 20, head=b""):
+    """Yield raw (key, value) pairs from an open text .strings file in one pass over chunked input.
+
+    head holds bytes already read from f. Comments are skipped inline, escaped quotes stay part
+    of the string and the escape sequences themselves are left for escape_codec.unquote.
+    """
+    raw = head + f.read(max(chunk_size, 4) - len(head))
+    encoding = detect_strings_encoding(raw)
+    logger.info(f"Reading STRINGS file using {encoding} encoding")
+
+    decoder = codecs.getincrementaldecoder(encoding)()
+    eof = not raw
+    buffer = decoder.decode(raw, final=eof)
+    pos = 0
+    state = 0  # 0: expecting key, 1: "=", 2: value, 3: ";"
+    key = value = None
+
+    match_entry = STRINGS_ENTRY.match
+    entry_start = 0
+    lookahead = max(16 * chunk_size, 1 << 16)
+
+    while True:
+        if state == 0:
+            entry = match_entry(buffer, pos)
+            while entry:
+                yield entry.groups()
+                pos = entry.end()
+                entry = match_entry(buffer, pos)
+            entry_start = pos
+
+        token = STRINGS_TOKEN.match(buffer, pos)
+        # The token may continue in the next chunk (open string, comment or word); an unclosed
+        # quote or comment is read ahead up to a bound before it is taken for a stray character
+        need_more = not eof and (token is None or token.end() == len(buffer) or (
+            token.lastindex == 4 and buffer[pos] in '"/' and len(buffer) - pos < lookahead))
+
+        if not need_more and state == 3 and token is not None and token.lastindex and token.group(token.lastindex) != ";":
+            # A value with unescaped quotes ("Say "hi"";), which the old regex parser accepted too
+            entry = STRINGS_LENIENT_ENTRY.match(buffer, entry_start)
+            if entry:
+                yield entry.groups()
+                pos = entry.end()
+                state = 0
+                continue
+            need_more = not eof and buffer.find("\n", pos) == -1
+
+        if need_more:
+            raw = f.read(chunk_size)
+            eof = not raw
+            # Restart from the beginning of a partly read entry so it is matched as a whole
+            buffer = buffer[entry_start if state else pos:] + decoder.decode(raw, final=eof)
+            pos = entry_start = 0
+            state = 0
+            continue
+        if token is None:
+            break
+
+        pos = token.end()
+        kind = token.lastindex
+        if kind is None:  # whitespace or comment
+            continue
+        if kind == 4:
+            logger.warning(f"Skipping unexpected character {token.group(4)!r} in {getattr(f, 'name', None) or 'STRINGS input'}")
+            state = 0
+            continue
+
+        text = token.group(kind)
+        is_string = kind in (1, 3)
+        if state == 0:
+            if is_string:
+                key, state = text, 1
+        elif state == 1:
+            if text == "=":
+                state = 2
+            else:
+                state = 0
+                if is_string:
+                    pos = token.start()
+        elif state == 2:
+            if is_string:
+                value, state = text, 3
+            else:
+                state = 0
+        else:
+            state = 0
+            if text == ";":
+                yield key, value
+            else:
+                pos = token.start()
+
+def detect_strings_encoding(head):
+    if head.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    if len(head) >= 2 and head[0] and not head[1]:
+        return "utf-16-le"
+    if len(head) >= 2 and not head[0] and head[1]:
+        return "utf-16-be"
+    return "utf-8"
+
+def iter_binary_strings(data):
+    """Yield (key, value) from the bytes of a binary property list .strings; values are plain text.
+
+    A .strings plist is one dictionary of strings, so its offset table and dictionary are
+    read directly instead of going through plistlib's generic object decoder.
+    """
+    if len(data) < len(BINARY_PLIST_MAGIC) + BPLIST_TRAILER.size:
+        raise ValueError("truncated binary property list")
+    offset_size, ref_size, count, top, table_offset = BPLIST_TRAILER.unpack_from(data, len(data) - BPLIST_TRAILER.size)
+    if offset_size not in BPLIST_INT or ref_size not in BPLIST_INT:
+        raise ValueError(f"unsupported binary property list integer sizes: {offset_size}/{ref_size}")
+    offsets = struct.unpack_from(f">{count}{BPLIST_INT[offset_size]}", data, table_offset)
+
+    pos = offsets[top]
+    if data[pos] >> 4 != 0xD:
+        raise ValueError("binary property list is not a dictionary of strings")
+    size, pos = _bplist_length(data, pos)
+    refs = struct.unpack_from(f">{2 * size}{BPLIST_INT[ref_size]}", data, pos)
+
+    # Every object decoded once; strings shared by several entries are stored only once
+    strings = [_bplist_string(data, offset) for offset in offsets]
+    for key, value in zip(map(strings.__getitem__, refs[:size]), map(strings.__getitem__, refs[size:])):
+        if key is None or value is None:
+            logger.warning(f"Skipping non-string binary property list entry: {key!r}")
+            continue
+        yield key, value
+
+def _bplist_length(data, pos):
+    """Length held in the marker byte at pos, or in the integer object after it; returns (length, content position)."""
+    length = data[pos] & 0xF
+    if length != 0xF:
+        return length, pos + 1
+    width = 1 << (data[pos + 1] & 0xF)
+    return int.from_bytes(data[pos + 2:pos + 2 + width], "big"), pos + 2 + width
+
+def _bplist_string(data, pos):
+    """ASCII (0x5) or UTF-16 (0x6) string object at pos, None for any other object."""
+    kind = data[pos] >> 4
+    if kind != 0x5 and kind != 0x6:
+        return None
+    length = data[pos] & 0xF
+    pos += 1
+    if length == 0xF:
+        width = 1 << (data[pos] & 0xF)
+        length = int.from_bytes(data[pos + 1:pos + 1 + width], "big")
+        pos += 1 + width
+    if kind == 0x5:
+        return data[pos:pos + length].decode("ascii")
+    return data[pos:pos + 2 * length].decode("utf-16-be")
+
+def _bplist_marker(kind, length):
+    if length < 0xF:
+        return bytes((kind << 4 | length,))
+    for power, code in enumerate("BHIQ"):
+        if length < 1 << (8 << power):
+            return bytes((kind << 4 | 0xF, 0x10 | power)) + struct.pack(f">{code}", length)
+
+def write_binary_plist(f, entries):
+    """Write entries to a binary file object as a bplist00 dictionary of strings, each distinct string stored once."""
+    refs = {}
+    key_refs = [refs.setdefault(key, len(refs) + 1) for key in entries]
+    value_refs = [refs.setdefault(value, len(refs) + 1) for value in entries.values()]
+    count = len(refs) + 1
+    ref_size = 1 if count < 1 << 8 else 2 if count < 1 << 16 else 4
+
+    marker = _bplist_marker
+    ascii_markers = [marker(0x5, length) for length in range(256)]
+    objects = [marker(0xD, len(entries)) + struct.pack(f">{2 * len(entries)}{BPLIST_INT[ref_size]}", *key_refs, *value_refs)]
+    for string in refs:
+        if string.isascii():
+            length = len(string)
+            objects.append((ascii_markers[length] if length < 256 else marker(0x5, length)) + string.encode("ascii"))
+        else:
+            encoded = string.encode("utf-16-be")
+            objects.append(marker(0x6, len(encoded) // 2) + encoded)
+
+    offsets = list(itertools.accumulate(map(len, objects), initial=len(BINARY_PLIST_MAGIC)))
+    table_offset = offsets.pop()
+    offset_size = next(size for size in (1, 2, 4, 8) if table_offset < 1 << (8 * size))
+    f.write(BINARY_PLIST_MAGIC)
+    f.write(b"".join(objects))
+    f.write(struct.pack(f">{count}{BPLIST_INT[offset_size]}", *offsets))
+    f.write(BPLIST_TRAILER.pack(offset_size, ref_size, count, 0, table_offset))
+
+def strings_line(name, text, export_empty=False):
+    """The .strings line of one string, or None for a string without text unless export_empty.
+
+    Format specifiers are left as they are, see join_strings_lines().
+    """
+    if text is not None:
+        return f"\"{name}\" = \"{escape_codec.quote(text)}\";\n"
+    if export_empty:
+        return f"\"{name}\" = \"\";\n"
+    return None
+
+def join_strings_lines(lines, convert_formats=True):
+    """One chunk of .strings lines, with Android format specifiers turned into Apple ones."""
+    chunk = "".join(lines)
+    if convert_formats:
+        # Names cannot hold a %, so the whole chunk is converted in one pass
+        chunk = escape_codec.to_apple_format(chunk)
+    return chunk
+
+def render_strings(strings, names, export_empty=False):
+    """Return (.strings lines, exported, exported empty, skipped empty) for the given names of strings.
+
+    Format specifiers are left as they are: a whole chunk of joined lines converts in one pass.
+    """
+    lines = []
+    empty = 0
+    for name in names:
+        text = strings[name]
+        line = strings_line(name, text, export_empty)
+        if line is not None:
+            lines.append(line)
+            if text is None:
+                empty += 1
+    skipped = len(names) - len(lines)
+    return lines, len(lines) - empty, empty, skipped
+
+def binary_entries(strings, names, export_empty=False, convert_formats=True):
+    """Return (plist entries, exported, exported empty, skipped empty) for the given names of strings.
+
+    Property lists hold plain text, so values are resolved instead of quoted.
+    """
+    exported = [name for name in names if strings[name] is not None]
+    resolve = escape_codec.resolve
+    values = [resolve(strings[name]) for name in exported]
+    if convert_formats:
+        values = escape_codec.to_apple_format_batch(values)
+    entries = dict(zip(exported, values))
+    empty_count = len(names) - len(exported)
+    if export_empty and empty_count:
+        entries = {name: entries.get(name, "") for name in names}
+        return entries, len(exported), empty_count, 0
+    return entries, len(exported), 0, empty_count
+
+def write_strings(destination, strings, export_empty=False, sort=True, convert_formats=True, binary=False,
+                  header=STRINGS_HEADER, phase=None):
+    """Write strings (a mapping or (name, text) pairs) as a .strings file, return (exported, exported empty, skipped empty).
+
+    destination is a path or an open file: binary for a property list, text or binary otherwise.
+    Texts that are None are written as "" with export_empty and skipped otherwise. phase, if
+    given, is called with "transform", "serialize" or "write" and returns a context manager
+    entered around that step, e.g. to time it.
+    """
+    phase = phase or _no_phase
+    if not isinstance(strings, collections.abc.Mapping):
+        strings = dict(strings)
+    with phase("transform"):
+        names = sorted(strings) if sort else list(strings)
+
+    with open_destination(destination) as f:
+        if binary:
+            with phase("transform"):
+                entries, *counts = binary_entries(strings, names, export_empty, convert_formats)
+            with phase("write"):
+                write_binary_plist(f, entries)
+            return tuple(counts)
+
+        write = text_writer(f)
+        write(header)
+        counts = [0, 0, 0]
+        for start in range(0, len(names), EXPORT_BATCH_SIZE):
+            with phase("transform"):
+                lines, *batch_counts = render_strings(strings, names[start:start + EXPORT_BATCH_SIZE], export_empty)
+            with phase("serialize"):
+                chunk = join_strings_lines(lines, convert_formats)
+            with phase("write"):
+                write(chunk)
+            counts = [total + count for total, count in zip(counts, batch_counts)]
+        return tuple(counts)
+
+def _no_phase(name):
+    return _NO_PHASE
+
+_NO_PHASE = contextlib.nullcontext()
+
+# Importing .strings texts into strings.xml
+
+class ImportBase:
+    """A source strings.xml read once by prepare_import() and shared by the imports into it.
+
+    Holds either the source bytes (memory-mapped for files) with their string offset index,
+    which every import only reads, or the parsed tree, which imports that share the base must
+    clone before updating it. Texts read from the source are kept by offset, so each one is
+    decoded once, and the <string> elements of a tree are counted by iter_import_changes().
+    """
+
+    __slots__ = ("file_path", "source", "index", "tree", "texts", "count")
+
+    def __init__(self, file_path, source=None, index=None, tree=None):
+        self.file_path = file_path
+        self.source = source
+        self.index = index
+        self.tree = tree
+        self.texts = {}
+        self.count = None
+
+    def __len__(self):
+        if self.tree is None:
+            return len(self.index)
+        if self.count is None:  # not imported into yet
+            self.count = sum(1 for _ in self.tree.getroot().iter("string"))
+        return self.count
+
+    def close(self):
+        if isinstance(self.source, mmap.mmap):
+            self.source.close()
+        self.source = None
+
+def prepare_import(source, patch=True):
+    """Read a source strings.xml once for importing: as an offset index when it can be patched, else as a tree."""
+    file_path = os.fspath(source) if is_path(source) else None
+    data = None
+    if patch:
+        if file_path is not None:
+            data = map_xml_source(file_path)
+        else:
+            # Read once: a stream cannot be read again for the tree parse below
+            with open_source(source) as f:
+                source = f.read()
+            data = source if is_scannable_xml(source) else None
+        index = index_xml_strings(data) if data else None
+        if index is not None:
+            return ImportBase(file_path, data, index)
+        if isinstance(data, mmap.mmap):
+            data.close()
+            data = None
+    return ImportBase(file_path, tree=parse_xml_tree(file_path or data or source))
+
+def iter_import_changes(base, strings, validate_placeholders=True):
+    """Yield (status, name, old text, new text, target) for each <string> of base whose name strings holds.
+
+    status is "success" for a text to update, "mismatch" when its placeholders differ from the
+    old text's (with validate_placeholders) and "failed" when there is nothing to change. The
+    targets of successes go to write_import() with their new texts.
+    """
+    tree = base.tree
+    if tree is not None:
+        def tree_entries():
+            count = 0
+            for count, str_obj in enumerate(tree.getroot().iter("string"), 1):
+                yield str_obj.get("name"), str_obj
+            base.count = count
+
+        entries = tree_entries()
+        text_of = lambda str_obj: str_obj.text
+    else:
+        source = base.source
+        entries = ((name, (start, end)) for name, start, end in base.index)
+        texts = base.texts
+
+        def text_of(span):
+            # Decoded once per base, however many imports share it
+            text = texts.get(span[0], False)
+            if text is False:
+                text = texts[span[0]] = read_xml_text(source, *span)
+            return text
+
+    placeholders_match = escape_codec.placeholders_match
+    for name, target in entries:
+        if name in strings and name:
+            old_text = text_of(target)
+            new_text = strings[name]
+            if old_text != new_text and old_text is not None and validate_placeholders and not placeholders_match(old_text, new_text):
+                yield "mismatch", name, old_text, new_text, target
+            elif old_text != new_text and old_text is not None:
+                yield "success", name, old_text, new_text, target
+            else:
+                yield "failed", name, old_text, new_text, target
+
+def write_import(base, updates, f):
+    """Write the source of base with updates, (target, new text) pairs, applied to a binary file object.
+
+    A tree base is updated in place.
+    """
+    if base.tree is None:
+        write_patched_xml(base.source, updates, f)
+        return
+    for str_obj, new_text in updates:
+        str_obj.text = new_text
+    write_xml_tree(base.tree, f)
+
+def apply_strings(source, strings, destination, validate_placeholders=True, patch=True):
+    """Yield (status, name, old text, new text) for each <string> of source whose name strings holds,
+    then write source with the successful updates to destination (a path or a binary file).
+
+    Nothing is written when no text changed, nor when the iteration is not run to the end.
+    """
+    if not isinstance(strings, collections.abc.Mapping):
+        strings = dict(strings)
+    base = prepare_import(source, patch)
+    try:
+        updates = []
+        for status, name, old_text, new_text, target in iter_import_changes(base, strings, validate_placeholders):
+            if status == "success":
+                updates.append((target, new_text))
+            yield status, name, old_text, new_text
+        if updates:
+            with open_destination(destination) as f:
+                write_import(base, updates, f)
+    finally:
+        base.close()
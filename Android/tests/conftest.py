@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+# The converter modules live next to this folder rather than in an installed package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """A non-interactive converter whose config, cache and logs live under tmp_path."""
+    from XML_to_STRINGS_Converter import XMLtoSTRINGS
+    
+    monkeypatch.setenv("HOME", str(tmp_path / "home"))
+    monkeypatch.setenv("APPDATA", str(tmp_path / "home"))
+    converter = XMLtoSTRINGS(interactive=False)
+    converter.cache.enabled = False
+    converter.profiler.enabled = False
+    return converter
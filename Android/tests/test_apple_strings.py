@@ -0,0 +1,56 @@
+import io
+
+import pytest
+
+import strings_api
+
+def parse(data: bytes, chunk_size: int = 1 << 20):
+    return list(strings_api.iter_raw_apple_strings(io.BytesIO(data), chunk_size))
+
+def test_last_entry_without_semicolon_is_dropped():
+    assert parse(b'"a" = "b";\n"c" = "d"\n') == [("a", "b")]
+
+def test_last_entry_without_semicolon_at_end_of_file():
+    assert parse(b'"a" = "b";\n"c" = "d"') == [("a", "b")]
+
+def test_escaped_quotes_stay_part_of_the_string():
+    assert parse(b'"say \\"hi\\"" = "He said \\"hi\\"";\n') == [('say \\"hi\\"', 'He said \\"hi\\"')]
+
+def test_unescaped_quotes_inside_a_value():
+    assert parse(b'"a" = "Say "hi"";\n"b" = "c";\n') == [("a", 'Say "hi"'), ("b", "c")]
+
+def test_comment_markers_inside_values():
+    data = b'// header\n"url" = "http://example.com";\n/* x */ "c" = "/* not a comment */";\n'
+    assert parse(data) == [("url", "http://example.com"), ("c", "/* not a comment */")]
+
+def test_comments_between_tokens():
+    assert parse(b'"a" /* k */ = // v\n "b" ;\n') == [("a", "b")]
+
+def test_utf16_with_bom():
+    assert parse('"ключ" = "значення";\n'.encode("utf-16")) == [("ключ", "значення")]
+
+SAMPLE = (
+    '/* Multi-line\n   comment */\n'
+    '"plain" = "text";\n'
+    '// line comment with "quotes"\n'
+    '"url" = "http://example.com/a//b";\n'
+    '"escaped" = "a \\"quoted\\" \\\\ value\\n";\n'
+    '"unescaped" = "Say "hi"";\n'
+    '"spaced"   =\n   "value"   ;\n'
+    '"unicode" = "Привіт 日本語 🎉";\n'
+    '"last" = "entry"'
+).encode("utf-8")
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 7, 11, 16, 31, 64, 128])
+def test_chunk_boundaries_do_not_change_the_result(chunk_size):
+    assert parse(SAMPLE, chunk_size) == parse(SAMPLE)
+
+def test_sample_entries():
+    assert parse(SAMPLE) == [
+        ("plain", "text"),
+        ("url", "http://example.com/a//b"),
+        ("escaped", 'a \\"quoted\\" \\\\ value\\n'),
+        ("unescaped", 'Say "hi"'),
+        ("spaced", "value"),
+        ("unicode", "Привіт 日本語 🎉"),
+    ]
@@ -0,0 +1,17 @@
+import XML_to_STRINGS_Converter as converter
+
+def run(*argv):
+    return converter.run_command(converter.parse_args(list(argv)))
+
+def test_delta_of_a_missing_file_fails(app, tmp_path, capsys):
+    new_xml = tmp_path / "strings.xml"
+    new_xml.write_text('<resources><string name="a">A</string></resources>', encoding="utf-8")
+    assert not run("delta", str(tmp_path / "nope.xml"), str(new_xml), "-o", str(tmp_path / "d.strings"))
+    assert "Export error" in capsys.readouterr().out
+
+def test_apply_delta_of_a_missing_file_fails(app, tmp_path, capsys):
+    xml = tmp_path / "strings.xml"
+    xml.write_text('<resources><string name="a">A</string></resources>', encoding="utf-8")
+    assert not run("apply-delta", str(xml), str(tmp_path / "nope.strings"), "-o", str(tmp_path / "out.xml"))
+    assert "Import error" in capsys.readouterr().out
+    assert not (tmp_path / "out.xml").exists()
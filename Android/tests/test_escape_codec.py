@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+import escape_codec
+
+# The chained-replace quote_unicode/unquote_unicode that escape_codec replaced, kept verbatim
+# as the reference its output must match
+def baseline_quote(s: str):
+    if not s:
+        return s
+    
+    if s.startswith('"') and s.endswith('"'):
+        s = s[1:-1]
+    
+    s = s.replace("\a", "\\a")   # Bell
+    s = s.replace("\b", "\\b")   # Backspace
+    s = s.replace("\f", "\\f")   # Form feed
+    s = s.replace("\n", "\\n")   # Newline
+    s = s.replace("\r", "\\r")   # Carriage return
+    s = s.replace("\t", "\\t")   # Tab
+    s = s.replace("\v", "\\v")   # Vertical tab
+    s = s.replace("\0", "\\0")   # Null character
+    
+    return s
+
+def baseline_unquote(s: str):
+    if not s:
+        return s
+    
+    s = s.replace("\\0", "\0")
+    s = s.replace("\\v", "\v")
+    s = s.replace("\\t", "\t")
+    s = s.replace("\\r", "\r")
+    s = s.replace("\\n", "\n")
+    s = s.replace("\\f", "\f")
+    s = s.replace("\\b", "\b")
+    s = s.replace("\\a", "\a")
+    
+    if "  " in s or "'" in s or "\n" in s or "\r" in s or "\t" in s or (s and (s[0] == " " or s[-1] == " ")):
+        s = f'"{s}"'
+    
+    if s and s[0] == "?":
+        s = f"\\{s}"
+    
+    return s
+
+# Pieces that exercise every branch: escapes and their characters, quotes, backslashes,
+# spaces, "?" prefixes, other control characters and non-ASCII text
+FRAGMENTS = [
+    "a", "Save", " ", "  ", "?", "'", '"', "\\", "\\\\", "\\'", '\\"', "%1$s", "%@", "&amp;", "Привіт", "日本語", "🎉",
+    "\a", "\b", "\f", "\n", "\r", "\t", "\v", "\0", "\x01", "\x1b", "\x7f", " ",
+    "\\a", "\\b", "\\f", "\\n", "\\r", "\\t", "\\v", "\\0", "\\u0041", "\\x",
+]
+
+def generate(count: int, seed: int):
+    rng = random.Random(seed)
+    values = ["", " ", "?", '"', '""', '" "', "?a", " a", "a "]
+    for _ in range(count):
+        value = "".join(rng.choices(FRAGMENTS, k=rng.randint(1, 8)))
+        if rng.random() < 0.1:
+            value = f'"{value}"'
+        if rng.random() < 0.05:
+            value = "?" + value
+        values.append(value)
+    return values
+
+@pytest.mark.parametrize("seed", range(5))
+def test_quote_matches_the_baseline(seed):
+    for value in generate(20000, seed):
+        assert escape_codec.quote(value) == baseline_quote(value), repr(value)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_unquote_matches_the_baseline(seed):
+    for value in generate(20000, seed):
+        assert escape_codec.unquote(value) == baseline_unquote(value), repr(value)
+
+@pytest.mark.parametrize("seed", range(5))
+def test_round_trip_matches_the_baseline(seed):
+    for value in generate(20000, seed):
+        assert escape_codec.unquote(escape_codec.quote(value)) == baseline_unquote(baseline_quote(value)), repr(value)
+
+def test_batches_match_single_values():
+    values = generate(5000, 42)
+    assert escape_codec.quote_batch(values) == [baseline_quote(value) for value in values]
+    assert escape_codec.unquote_batch(values) == [baseline_unquote(value) for value in values]
@@ -0,0 +1,121 @@
+import io
+
+import pytest
+
+import strings_api
+import XML_to_STRINGS_Converter as converter
+
+HEADER = '<?xml version="1.0" encoding="utf-8"?>\n<resources>\n'
+STRINGS = '    <string name="a">A</string>\n    <string name="b">B</string>\n    <string name="c">C</string>\n'
+
+def write_lproj(strings_dir, locale, text):
+    folder = strings_dir / f"{locale}.lproj"
+    folder.mkdir(parents=True)
+    (folder / "Localizable.strings").write_text(text, encoding="utf-8")
+
+@pytest.mark.parametrize("text", [
+    HEADER + STRINGS,                                   # truncated after the last string
+    HEADER + STRINGS.replace("</string>\n    <string name=\"b\">", "\n    <string name=\"b\">", 1) + "</resources>\n",
+    HEADER + STRINGS + "</resources>\n<resources/>\n",  # two root elements
+])
+def test_malformed_source_is_parsed_as_a_tree_and_reported(app, tmp_path, text):
+    source = tmp_path / "strings.xml"
+    source.write_text(text, encoding="utf-8")
+    assert strings_api.index_xml_strings(source.read_bytes()) is None
+    with pytest.raises(Exception):
+        strings_api.prepare_import(source)
+    with pytest.raises(Exception):
+        app.prepare_import(str(source))
+
+def test_well_formed_source_is_patched(app, tmp_path):
+    source = tmp_path / "strings.xml"
+    source.write_text(HEADER + STRINGS + "</resources>\n", encoding="utf-8")
+    base = app.prepare_import(str(source))
+    try:
+        assert base.tree is None and len(base) == 3
+    finally:
+        base.close()
+
+def test_fan_out_of_a_broken_base_fails(app, tmp_path, capsys):
+    base_xml = tmp_path / "broken.xml"
+    base_xml.write_text(HEADER + STRINGS, encoding="utf-8")
+    write_lproj(tmp_path / "out", "en", '"a" = "x";\n"b" = "y";\n"c" = "z";\n')
+    batch = converter.BatchConverter(app, jobs=1)
+    assert not batch.run_fan_out(str(base_xml), str(tmp_path / "out"), str(tmp_path / "fo"))
+    assert "Error reading file" in capsys.readouterr().out
+    assert not (tmp_path / "fo").exists()
+
+def test_fan_out_job_uses_a_base_without_strings(app, tmp_path):
+    base_xml = tmp_path / "strings.xml"
+    base_xml.write_text(HEADER + "</resources>\n", encoding="utf-8")
+    write_lproj(tmp_path / "out", "en", '"a" = "x";\n')
+    base = app.prepare_import(str(base_xml))
+    try:
+        assert not base
+        result = converter._batch_fan_out_job(str(tmp_path / "out" / "en.lproj" / "Localizable.strings"),
+                                              str(tmp_path / "fo" / "values-en" / "strings.xml"), app=app, base=base)
+    finally:
+        base.close()
+    assert result["status"] == "ok" and result["updated"] == 0
+
+def write_archive(file_path):
+    import zipfile
+    with zipfile.ZipFile(file_path, "w") as archive:
+        archive.writestr("res/values/strings.xml", HEADER + STRINGS + "</resources>\n")
+        archive.writestr("res/values-de/strings.xml", HEADER + STRINGS + "</resources>\n")
+
+def test_batch_import_rejects_an_archive(app, tmp_path, capsys):
+    write_archive(tmp_path / "app.apk")
+    batch = converter.BatchConverter(app, jobs=1)
+    assert not batch.run_import(str(tmp_path / "app.apk"), str(tmp_path / "strings"), str(tmp_path / "out"))
+    assert "can only be exported" in capsys.readouterr().out
+    assert not (tmp_path / "out").exists()
+
+def test_fan_out_rejects_an_archive_entry(app, tmp_path, capsys):
+    write_archive(tmp_path / "app.apk")
+    write_lproj(tmp_path / "strings", "de", '"a" = "x";\n')
+    batch = converter.BatchConverter(app, jobs=1)
+    assert not batch.run_fan_out(str(tmp_path / "app.apk") + "!/res/values/strings.xml", str(tmp_path / "strings"), str(tmp_path / "out"))
+    assert "can only be exported" in capsys.readouterr().out
+
+def test_import_source_input_rejects_an_archive_entry(app, tmp_path, monkeypatch, capsys):
+    write_archive(tmp_path / "app.apk")
+    entry = str(tmp_path / "app.apk") + "!/res/values/strings.xml"
+    monkeypatch.setattr(converter, "load_readchar", lambda: None)
+    monkeypatch.setattr(converter.time, "sleep", lambda seconds: None)
+    answers = iter([entry])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    assert app.file_input("existing", "xml") == entry
+
+    answers = iter([entry, "\x1b"])
+    with pytest.raises(converter.UserCancelled):
+        app.file_input("existing", "xml", archive_entries=False)
+    assert "Archive entries can only be exported" in capsys.readouterr().out
+
+@pytest.mark.parametrize("encoding, declaration", [
+    ("utf-8", '<?xml version="1.0" encoding="utf-8"?>\n'),
+    ("utf-16", '<?xml version="1.0" encoding="utf-16"?>\n'),
+    ("utf-8", '<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE resources>\n'),
+])
+def test_file_object_source_is_imported(encoding, declaration):
+    data = (declaration + HEADER.partition("\n")[2] + STRINGS + "</resources>\n").encode(encoding)
+    changes = list(strings_api.apply_strings(io.BytesIO(data), {"b": "Bee"}, io.BytesIO()))
+    assert [(status, name, new) for status, name, _, new in changes] == [("success", "b", "Bee")]
+    assert changes == list(strings_api.apply_strings(data, {"b": "Bee"}, io.BytesIO()))
+
+def test_in_place_import_unmaps_the_source_before_replacing_it(app, tmp_path, monkeypatch):
+    source = tmp_path / "strings.xml"
+    source.write_text(HEADER + STRINGS + "</resources>\n", encoding="utf-8")
+    events = []
+    close, replace = strings_api.ImportBase.close, converter.os.replace
+    monkeypatch.setattr(strings_api.ImportBase, "close", lambda base: (events.append("close"), close(base)))
+    monkeypatch.setattr(converter.os, "replace", lambda *paths: (events.append("replace"), replace(*paths)))
+    assert app.import_strings(str(source), str(source), {"b": "Bee"}, patch=True) == 1
+    assert events.index("close") < events.index("replace")
+    assert '<string name="b">Bee</string>' in source.read_text(encoding="utf-8")
+
+def test_tree_base_is_counted_while_importing():
+    base = strings_api.prepare_import((HEADER + STRINGS + "</resources>\n").encode("utf-8"), patch=False)
+    assert base.count is None
+    assert [name for _, name, *_ in strings_api.iter_import_changes(base, {"a": "x"})] == ["a"]
+    assert base.count == 3 and len(base) == 3
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+import XML_to_STRINGS_Converter as converter
+
+@pytest.fixture
+def batch(app):
+    return converter.BatchConverter(app, jobs=1)
+
+@pytest.mark.parametrize("folder, locale", [
+    ("values", "Base"),
+    ("values-de", "de"),
+    ("values-pt-rBR", "pt-BR"),
+    ("values-es-r419", "es-419"),
+    ("values-in", "id"),
+    ("values-b+sr+Latn", "sr-Latn"),
+    ("values-de-land", None),
+    ("values-de-v21", None),
+    ("values-de-rDE-night", None),
+    ("values-b+sr+Latn-land", None),
+    ("values-car", None),
+    ("values-hdr", None),
+    ("values-night", None),
+    ("values-sw600dp", None),
+    ("values-v21", None),
+])
+def test_apple_locale(batch, folder, locale):
+    assert batch.apple_locale(folder) == locale
+
+def test_each_locale_is_exported_from_one_folder(batch, tmp_path):
+    res = tmp_path / "res"
+    for folder in ["values-de", "values-de-land", "values-de-v21", "values-car", "values-in", "values-id"]:
+        (res / folder).mkdir(parents=True)
+        (res / folder / "strings.xml").write_text('<resources><string name="a">A</string></resources>', encoding="utf-8")
+    jobs = batch.export_jobs(str(res), str(tmp_path / "out"))
+    assert [(os.path.relpath(source, res), os.path.relpath(output, tmp_path / "out")) for source, output in jobs] == [
+        (os.path.join("values-de", "strings.xml"), os.path.join("de.lproj", "Localizable.strings")),
+        (os.path.join("values-id", "strings.xml"), os.path.join("id.lproj", "Localizable.strings")),
+    ]
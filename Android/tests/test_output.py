@@ -0,0 +1,29 @@
+import os
+
+def write(app, file_path, text):
+    with app.open_output(str(file_path)) as f:
+        f.write(text)
+
+def test_unchanged_output_keeps_the_existing_file(app, tmp_path):
+    output = tmp_path / "Localizable.strings"
+    write(app, output, '"a" = "b";\n')
+    os.utime(output, ns=(0, 0))
+    write(app, output, '"a" = "b";\n')
+    assert os.stat(output).st_mtime_ns == 0
+    assert sorted(os.listdir(tmp_path)) == ["Localizable.strings", "home"]
+
+def test_changed_output_of_the_same_size_is_written(app, tmp_path):
+    output = tmp_path / "Localizable.strings"
+    write(app, output, '"a" = "b";\n')
+    os.utime(output, ns=(0, 0))
+    write(app, output, '"a" = "c";\n')
+    assert output.read_text(encoding="utf-8") == '"a" = "c";\n'
+    assert os.stat(output).st_mtime_ns != 0
+
+def test_overwrite_if_changed_off_always_writes(app, tmp_path):
+    app.config.set("overwrite_if_changed", False)
+    output = tmp_path / "Localizable.strings"
+    write(app, output, '"a" = "b";\n')
+    os.utime(output, ns=(0, 0))
+    write(app, output, '"a" = "b";\n')
+    assert os.stat(output).st_mtime_ns != 0
@@ -0,0 +1,37 @@
+import tracemalloc
+
+import XML_to_STRINGS_Converter as converter
+
+def test_nested_phase_keeps_the_outer_peak(tmp_path):
+    profiler = converter.PhaseProfiler(True, str(tmp_path / "metrics.jsonl"))
+    try:
+        profiler.begin("test", str(tmp_path))
+        with profiler.phase("parse"):
+            block = bytearray(8 << 20)
+            del block
+            with profiler.phase("read"):
+                pass
+        metrics = profiler.end(1)
+    finally:
+        profiler.enabled = False
+    assert metrics["phases"]["parse"]["peak_memory_bytes"] >= 8 << 20
+    assert metrics["phases"]["read"]["peak_memory_bytes"] < 8 << 20
+
+def test_disabling_stops_tracing(tmp_path):
+    assert not tracemalloc.is_tracing()
+    profiler = converter.PhaseProfiler(True, str(tmp_path / "metrics.jsonl"))
+    profiler.begin("test", str(tmp_path))
+    assert tracemalloc.is_tracing()
+    profiler.enabled = False
+    assert not tracemalloc.is_tracing()
+
+def test_settings_toggle_applies_to_the_running_session(app, monkeypatch):
+    app.config.set("profiling", True)
+    app.profiler.enabled = True
+    choices = iter([9, 11])  # per-phase profiling, then back
+    monkeypatch.setattr(app, "choice_input", lambda msg, options: next(choices))
+    monkeypatch.setattr(app, "clear", lambda: None)
+    monkeypatch.setattr(app, "print_box", lambda *args, **kwargs: None)
+    app.open_settings()
+    assert app.config.get("profiling") is False
+    assert app.profiler.enabled is False
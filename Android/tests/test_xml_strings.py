@@ -0,0 +1,84 @@
+import io
+import xml.etree.ElementTree
+
+import pytest
+
+import strings_api
+
+SOURCE = """<?xml version="1.0" encoding="utf-8"?>
+<!-- <string name="commented_out">never read</string> -->
+<resources xmlns:tools="http://schemas.android.com/tools" xmlns:xliff="urn:oasis:names:tc:xliff:document:1.2">
+    <string name="plain">Plain text</string>
+    <string name="escaped">Don\\'t \\"quote\\" &amp; &lt;escape&gt;\\n</string>
+    <string name="empty"/>
+    <string name="empty_pair"></string>
+    <string name="cdata"><![CDATA[<b>bold</b> & raw]]> after</string>
+    <string name="markup">Hello <b>bold</b> and <i>italic</i> tail</string>
+    <string name="xliff">Count: <xliff:g id="count">%d</xliff:g> items</string>
+    <!-- Section comment -->
+    <string name="duplicate">first</string>
+    <string-array name="planets">
+        <item>Mercury</item>
+        <item>Venus</item>
+    </string-array>
+    <plurals name="songs">
+        <item quantity="one">%d song</item>
+        <item quantity="other">%d songs</item>
+    </plurals>
+    <string name="translatable" translatable="false" tools:ignore="MissingTranslation">Fixed</string>
+    <string name="duplicate">second</string>
+    <string name="unicode">Привіт 日本語 🎉</string>
+    <?processing instruction?>
+    <string name="multiline">Line one
+        line two</string>
+</resources>
+"""
+
+@pytest.fixture(params=["lxml", "xml.etree"])
+def backend(request, monkeypatch):
+    if request.param == "lxml":
+        etree = pytest.importorskip("lxml.etree")
+    else:
+        etree = xml.etree.ElementTree
+    monkeypatch.setattr(strings_api, "_etree", etree)
+    return request.param
+
+@pytest.fixture
+def source(tmp_path):
+    file_path = tmp_path / "strings.xml"
+    file_path.write_text(SOURCE, encoding="utf-8")
+    return str(file_path)
+
+def test_streaming_and_tree_parse_return_identical_dicts(app, backend, source):
+    streamed = app.get_xml_strings(source, streaming=True)
+    tree = app.get_xml_strings(source, streaming=False)
+    assert streamed == tree
+    assert list(streamed) == list(tree)
+
+def test_parsed_texts(app, backend, source):
+    strings = app.get_xml_strings(source, streaming=True)
+    assert "commented_out" not in strings and "planets" not in strings and "songs" not in strings
+    assert strings["plain"] == "Plain text"
+    assert strings["escaped"] == "Don\\'t \\\"quote\\\" & <escape>\\n"
+    assert strings["empty"] is None and strings["empty_pair"] is None
+    assert strings["cdata"] == "<b>bold</b> & raw after"
+    assert strings["markup"] == "Hello "
+    assert strings["xliff"] == "Count: "
+    assert strings["duplicate"] == "second"
+    assert strings["translatable"] == "Fixed"
+    assert strings["unicode"] == "Привіт 日本語 🎉"
+
+def test_streaming_from_bytes_and_files(backend, source):
+    with open(source, "rb") as f:
+        data = f.read()
+        f.seek(0)
+        assert list(strings_api.iter_xml_strings(f)) == list(strings_api.iter_xml_strings(source))
+    assert list(strings_api.iter_xml_strings(data)) == list(strings_api.iter_xml_strings(source))
+
+@pytest.mark.parametrize("sort", [True, False])
+def test_nameless_strings_are_not_exported(backend, sort):
+    data = b'<resources><string>no name</string><string name="">empty name</string><string name="b">B</string><string name="a">A</string></resources>'
+    assert list(strings_api.iter_xml_strings(data)) == [("b", "B"), ("a", "A")]
+    output = io.BytesIO()
+    assert strings_api.write_strings(output, strings_api.iter_xml_strings(data), sort=sort) == (2, 0, 0)
+    assert b"None" not in output.getvalue() and b"name" not in output.getvalue()